@@ -0,0 +1,133 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.author = User.objects.create_user(username='Author')
+        cls.group = Group.objects.create(
+            title='Заголовок группы',
+            slug='test-slug',
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.author, text=f'Пост {i}', group=cls.group)
+            for i in range(15)
+        )
+        cls.post = Post.objects.create(author=cls.user, text='Свой пост')
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_cursor_pagination_walks_whole_feed(self):
+        """Курсор обходит ленту без повторов и пропусков"""
+        seen = []
+        url = reverse('api:post_list')
+        params = {'fields': 'id'}
+        while True:
+            data = self.guest_client.get(url, params).json()
+            seen += [post['id'] for post in data['results']]
+            if data['next'] is None:
+                break
+            params['cursor'] = data['next']
+        self.assertEqual(
+            seen, list(Post.objects.order_by('-pub_date', '-id')
+                       .values_list('id', flat=True))
+        )
+
+    def test_sparse_fields_and_ids(self):
+        """Отдаются только запрошенные поля и объекты"""
+        ids = list(Post.objects.values_list('id', flat=True)[:3])
+        response = self.guest_client.get(reverse('api:post_list'), {
+            'fields': 'id,author',
+            'ids': ','.join(map(str, ids)),
+        })
+        results = response.json()['results']
+        self.assertEqual(sorted(post['id'] for post in results), sorted(ids))
+        self.assertEqual(set(results[0]), {'id', 'author'})
+
+    def test_bad_parameters(self):
+        """Неизвестные поля и испорченный курсор дают 400"""
+        for params in ({'fields': 'password'}, {'cursor': 'broken'}):
+            with self.subTest(params=params):
+                response = self.guest_client.get(
+                    reverse('api:post_list'), params
+                )
+                self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_group_and_profile_posts(self):
+        """Посты группы и пользователя отфильтрованы"""
+        response = self.guest_client.get(
+            reverse('api:group_posts', args=['test-slug']), {'limit': 100}
+        )
+        self.assertEqual(len(response.json()['results']), 15)
+        response = self.guest_client.get(
+            reverse('api:profile_posts', args=['SomeUser'])
+        )
+        self.assertEqual(response.json()['results'][0]['text'], 'Свой пост')
+
+    def test_write_requires_login(self):
+        """Запись без авторизации запрещена"""
+        response = self.guest_client.post(
+            reverse('api:post_list'), {'text': 'Текст'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+
+    def test_create_and_edit_post(self):
+        """Пост создаётся и редактируется автором через JSON"""
+        response = self.authorized_client.post(
+            reverse('api:post_list'),
+            json.dumps({'text': 'Новый пост', 'group': 'test-slug'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertEqual(response.json()['group'], 'test-slug')
+        post_id = response.json()['id']
+        response = self.authorized_client.patch(
+            reverse('api:post_detail', args=[post_id]),
+            json.dumps({'text': 'Исправленный пост'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.json()['text'], 'Исправленный пост')
+        self.assertEqual(response.json()['group'], 'test-slug')
+        other_post = Post.objects.filter(author=self.author).first()
+        response = self.authorized_client.patch(
+            reverse('api:post_detail', args=[other_post.id]),
+            json.dumps({'text': 'Чужой пост'}),
+            content_type='application/json',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+    def test_add_comment(self):
+        """Комментарий добавляется и появляется в списке"""
+        url = reverse('api:comment_list', args=[self.post.id])
+        response = self.authorized_client.post(url, {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertTrue(Comment.objects.filter(text='Комментарий').exists())
+        results = self.guest_client.get(url).json()['results']
+        self.assertEqual(results[0]['author'], 'SomeUser')
+
+    def test_follow_unfollow_and_feed(self):
+        """Подписка, лента подписок и отписка"""
+        url = reverse('api:profile_follow', args=['Author'])
+        response = self.authorized_client.post(url)
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        feed = self.authorized_client.get(
+            reverse('api:follow_index'), {'fields': 'author'}
+        ).json()['results']
+        self.assertEqual({post['author'] for post in feed}, {'Author'})
+        response = self.authorized_client.delete(url)
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Follow.objects.exists())
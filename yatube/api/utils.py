@@ -0,0 +1,175 @@
+import json
+from datetime import datetime
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+
+from core.pagination import paginate_by_cursor
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+MAX_PAGE_SIZE = 100
+MAX_IDS = 100
+
+# Поле ответа -> выражение для values(). Связанные объекты отдаются
+# одним значением, чтобы не строить экземпляры моделей.
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+GROUP_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+}
+
+
+class ApiError(Exception):
+    def __init__(self, detail, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def error_response(detail, status):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def api_view(*methods, login_required=False):
+    """Проверяет метод и авторизацию, ошибки отдаёт в формате JSON.
+
+    Запросы на запись всегда требуют авторизации через сессию.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                response = error_response(
+                    'Метод не поддерживается',
+                    HTTPStatus.METHOD_NOT_ALLOWED,
+                )
+                response['Allow'] = ', '.join(methods)
+                return response
+            needs_login = login_required or request.method not in SAFE_METHODS
+            if needs_login and not request.user.is_authenticated:
+                return error_response(
+                    'Требуется авторизация', HTTPStatus.UNAUTHORIZED
+                )
+            try:
+                return view(request, *args, **kwargs)
+            except ApiError as error:
+                return error_response(error.detail, error.status)
+            except Http404:
+                return error_response('Не найдено', HTTPStatus.NOT_FOUND)
+        return wrapper
+    return decorator
+
+
+def get_fields(request, available):
+    """Поля из ``?fields=``, по умолчанию — все доступные."""
+    requested = request.GET.get('fields')
+    if not requested:
+        return list(available)
+    fields = [name.strip() for name in requested.split(',') if name.strip()]
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ApiError(f'Неизвестные поля: {", ".join(unknown)}')
+    return fields
+
+
+def get_ids(request):
+    """Список ключей из ``?ids=`` для пакетного запроса."""
+    requested = request.GET.get('ids')
+    if not requested:
+        return None
+    try:
+        ids = [int(pk) for pk in requested.split(',') if pk.strip()]
+    except ValueError:
+        raise ApiError('Параметр ids должен содержать числа через запятую')
+    if len(ids) > MAX_IDS:
+        raise ApiError(f'Не больше {MAX_IDS} ключей в ids')
+    return ids
+
+
+def get_limit(request):
+    limit = request.GET.get('limit')
+    if limit is None:
+        return settings.POSTS_PER_PAGE
+    if not limit.isdigit() or not 0 < int(limit) <= MAX_PAGE_SIZE:
+        raise ApiError(f'limit должен быть от 1 до {MAX_PAGE_SIZE}')
+    return int(limit)
+
+
+def serialize(row, fields, lookups):
+    data = {}
+    for name in fields:
+        value = row[lookups[name]]
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif name == 'image':
+            value = settings.MEDIA_URL + value if value else None
+        data[name] = value
+    return data
+
+
+def list_response(request, queryset, lookups, field):
+    """Страница выборки по курсору с учётом ``fields``, ``ids`` и
+    ``limit``. Курсор следующей страницы отдаётся в поле ``next``."""
+    fields = get_fields(request, lookups)
+    ids = get_ids(request)
+    limit = get_limit(request)
+    if ids is not None:
+        queryset = queryset.filter(id__in=ids)
+        limit = max(len(ids), 1)
+    columns = {lookups[name] for name in fields} | {'id', field}
+    try:
+        rows, next_cursor = paginate_by_cursor(
+            queryset.values(*columns),
+            request.GET.get('cursor'),
+            limit,
+            field=field,
+        )
+    except ValueError as error:
+        raise ApiError(str(error))
+    return JsonResponse({
+        'results': [serialize(row, fields, lookups) for row in rows],
+        'next': next_cursor,
+    })
+
+
+def object_response(request, queryset, lookups, status=HTTPStatus.OK):
+    fields = get_fields(request, lookups)
+    row = queryset.values(*{lookups[name] for name in fields}).first()
+    if row is None:
+        raise Http404
+    return JsonResponse(serialize(row, fields, lookups), status=status)
+
+
+def parse_body(request):
+    """Данные запроса на запись: JSON-объект или данные формы."""
+    if request.content_type != 'application/json':
+        return request.POST.copy()
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        raise ApiError('Некорректный JSON')
+    if not isinstance(data, dict):
+        raise ApiError('Ожидается JSON-объект')
+    return data
+
+
+def form_error(form):
+    return ApiError(form.errors.get_json_data())
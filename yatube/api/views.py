@@ -0,0 +1,166 @@
+from http import HTTPStatus
+
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from core.ratelimit import ratelimit
+from posts.forms import CommentForm, PostForm
+from posts.models import Comment, Follow, Group, Post, User
+from .utils import (
+    COMMENT_FIELDS, GROUP_FIELDS, POST_FIELDS, ApiError, api_view,
+    form_error, get_fields, get_ids, list_response, object_response,
+    parse_body, serialize
+)
+
+
+def get_id_or_404(queryset, **lookup):
+    """Ключ объекта без загрузки всей строки."""
+    return get_object_or_404(queryset.values_list('id', flat=True), **lookup)
+
+
+def post_form_data(data, post=None):
+    """Данные для PostForm: группа в API задаётся слагом."""
+    form_data = {
+        'text': post.text if post else '',
+        'group': post.group_id if post else None,
+    }
+    form_data.update({
+        name: data[name] for name in ('text', 'group') if name in data
+    })
+    if 'group' in data:
+        slug = data['group']
+        form_data['group'] = (
+            get_id_or_404(Group.objects, slug=slug) if slug else None
+        )
+    return form_data
+
+
+@ratelimit('posts:post_create')
+@api_view('GET', 'POST')
+def post_list(request):
+    """Лента всех постов и создание поста"""
+    if request.method == 'GET':
+        return list_response(request, Post.objects, POST_FIELDS, 'pub_date')
+    form = PostForm(
+        post_form_data(parse_body(request)),
+        files=request.FILES or None,
+    )
+    if not form.is_valid():
+        raise form_error(form)
+    post = form.save(commit=False)
+    post.author = request.user
+    post.save()
+    return object_response(
+        request, Post.objects.filter(id=post.id), POST_FIELDS,
+        status=HTTPStatus.CREATED,
+    )
+
+
+@api_view('GET', 'PATCH')
+def post_detail(request, post_id):
+    """Пост и его редактирование автором"""
+    if request.method == 'GET':
+        return object_response(
+            request, Post.objects.filter(id=post_id), POST_FIELDS
+        )
+    post = get_object_or_404(Post, id=post_id)
+    if post.author_id != request.user.id:
+        raise ApiError(
+            'Редактировать пост может только автор', HTTPStatus.FORBIDDEN
+        )
+    form = PostForm(post_form_data(parse_body(request), post), instance=post)
+    if not form.is_valid():
+        raise form_error(form)
+    form.save()
+    return object_response(
+        request, Post.objects.filter(id=post_id), POST_FIELDS
+    )
+
+
+@ratelimit('posts:add_comment')
+@api_view('GET', 'POST')
+def comment_list(request, post_id):
+    """Комментарии к посту и добавление комментария"""
+    get_id_or_404(Post.objects, id=post_id)
+    if request.method == 'GET':
+        return list_response(
+            request, Comment.objects.filter(post_id=post_id),
+            COMMENT_FIELDS, 'created',
+        )
+    form = CommentForm(parse_body(request))
+    if not form.is_valid():
+        raise form_error(form)
+    comment = form.save(commit=False)
+    comment.author = request.user
+    comment.post_id = post_id
+    comment.save()
+    return object_response(
+        request, Comment.objects.filter(id=comment.id), COMMENT_FIELDS,
+        status=HTTPStatus.CREATED,
+    )
+
+
+@api_view('GET')
+def group_list(request):
+    """Список групп"""
+    fields = get_fields(request, GROUP_FIELDS)
+    groups = Group.objects.order_by('title')
+    ids = get_ids(request)
+    if ids is not None:
+        groups = groups.filter(id__in=ids)
+    rows = groups.values(*{GROUP_FIELDS[name] for name in fields})
+    return JsonResponse({
+        'results': [serialize(row, fields, GROUP_FIELDS) for row in rows],
+    })
+
+
+@api_view('GET')
+def group_posts(request, slug):
+    """Посты группы"""
+    group_id = get_id_or_404(Group.objects, slug=slug)
+    return list_response(
+        request, Post.objects.filter(group_id=group_id),
+        POST_FIELDS, 'pub_date',
+    )
+
+
+@api_view('GET')
+def profile_posts(request, username):
+    """Посты пользователя"""
+    author_id = get_id_or_404(User.objects, username=username)
+    return list_response(
+        request, Post.objects.filter(author_id=author_id),
+        POST_FIELDS, 'pub_date',
+    )
+
+
+@ratelimit('posts:profile_follow')
+@api_view('POST', 'DELETE')
+def profile_follow(request, username):
+    """Подписка на автора (POST) и отписка от него (DELETE)"""
+    author_id = get_id_or_404(User.objects, username=username)
+    if request.method == 'DELETE':
+        deleted, _ = Follow.objects.filter(
+            user=request.user, author_id=author_id
+        ).delete()
+        if not deleted:
+            raise ApiError('Подписка не найдена', HTTPStatus.NOT_FOUND)
+        return HttpResponse(status=HTTPStatus.NO_CONTENT)
+    if author_id == request.user.id:
+        raise ApiError('Нельзя подписаться на самого себя')
+    _, created = Follow.objects.get_or_create(
+        user=request.user, author_id=author_id
+    )
+    return JsonResponse(
+        {'author': username, 'following': True},
+        status=HTTPStatus.CREATED if created else HTTPStatus.OK,
+    )
+
+
+@api_view('GET', login_required=True)
+def follow_index(request):
+    """Лента подписок"""
+    return list_response(
+        request, Post.objects.filter(author__following__user=request.user),
+        POST_FIELDS, 'pub_date',
+    )
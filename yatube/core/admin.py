@@ -0,0 +1,144 @@
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+
+from .models import OutboundEmail, Task
+from .pagination import (
+    EstimatedCountPaginator, encode_cursor, order_after_cursor
+)
+
+CURSOR_VAR = 'cursor'
+
+
+class CursorChangeList(ChangeList):
+    """Список объектов в админке с переходом по курсору.
+
+    Пока пользователь не выбрал сортировку, следующая страница читается
+    по индексу от последнего показанного объекта, без ``OFFSET``.
+    """
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        self.next_url = self.first_url = None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        params.pop(CURSOR_VAR, None)
+        return params
+
+    def get_results(self, request):
+        if ORDER_VAR in self.params:
+            return super().get_results(request)
+        field = self.model_admin.cursor_field
+        per_page = self.list_per_page
+        try:
+            queryset = order_after_cursor(self.queryset, self.cursor, field)
+            result_list = queryset[:per_page]
+            count = len(result_list)
+        except ValueError:
+            raise IncorrectLookupParameters
+        if count == per_page:
+            last = result_list[count - 1]
+            next_cursor = encode_cursor(getattr(last, field), last.pk)
+            if order_after_cursor(self.queryset, next_cursor, field).exists():
+                self.next_url = self.get_query_string(
+                    {CURSOR_VAR: next_cursor}
+                )
+        if self.cursor:
+            self.first_url = self.get_query_string(remove=[CURSOR_VAR])
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, per_page
+        )
+        self.result_count = self.paginator.count
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.next_url or self.first_url)
+
+
+class PreloadedAutocompleteSelect(AutocompleteSelect):
+    """Автодополнение, которому подписи выбранных объектов можно передать
+    заранее в ``labels`` вместо запроса к базе."""
+    labels = None
+
+    def optgroups(self, name, value, attr=None):
+        if self.labels is None:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        for pk in value:
+            if pk in self.labels:
+                options.append(self.create_option(
+                    name, pk, self.labels[pk], True, len(options)
+                ))
+        return [(None, options, 0)]
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Настройки списка для больших таблиц.
+
+    Число строк без фильтров берётся из статистики СУБД, общий счётчик
+    при фильтрации не запрашивается, а при заданном ``cursor_field``
+    страницы листаются по курсору. Редактируемые в списке связи из
+    ``autocomplete_fields`` подписываются по строкам, загруженным через
+    ``list_select_related``, без запроса на каждую строку.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    cursor_field = None
+
+    def get_changelist(self, request, **kwargs):
+        if self.cursor_field:
+            return CursorChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', PreloadedAutocompleteSelect(
+                db_field.remote_field, self.admin_site,
+                using=kwargs.get('using'),
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def get_changelist_formset(self, request, **kwargs):
+        formset = super().get_changelist_formset(request, **kwargs)
+        names = [
+            name for name in self.list_editable
+            if name in self.get_autocomplete_fields(request)
+        ]
+
+        class PreloadedFormSet(formset):
+            def _construct_form(self, i, **kwargs):
+                form = super()._construct_form(i, **kwargs)
+                for name in names:
+                    related = getattr(form.instance, name)
+                    form.fields[name].widget.widget.labels = (
+                        {str(related.pk): str(related)} if related else {}
+                    )
+                return form
+
+        return PreloadedFormSet
+
+
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'subject', 'created', 'attempts', 'sent_at')
+    list_filter = ('sent_at',)
+    search_fields = ('subject',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(OutboundEmail, OutboundEmailAdmin)
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'created', 'run_after', 'attempts')
+    search_fields = ('name',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Task, TaskAdmin)
@@ -3,3 +3,16 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import metrics
+        from .models import OutboundEmail, Task
+
+        metrics.register_gauge(
+            'tasks_pending', 'Фоновые задачи в очереди', Task.objects.count
+        )
+        metrics.register_gauge(
+            'emails_pending',
+            'Неотправленные письма',
+            OutboundEmail.objects.filter(sent_at__isnull=True).count,
+        )
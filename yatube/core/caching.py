@@ -0,0 +1,12 @@
+from django.conf import settings
+
+# Бэкенды, данные которых видит только процесс, записавший их.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_shared(alias='default'):
+    """Кеш ``alias`` общий для всех процессов сервера и фоновых задач."""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
@@ -0,0 +1,61 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # brotli — необязательная зависимость
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.html', '.txt', '.xml', '.json', '.svg', '.ico', '.map',
+)
+# Сжатые копии меньше этого размера не окупают лишний файл и заголовки.
+MIN_COMPRESS_SIZE = 200
+
+
+def available_encodings():
+    """Кодировки в порядке предпочтения, поддерживаемые окружением."""
+    if brotli is not None:
+        return ('br', 'gzip')
+    return ('gzip',)
+
+
+def compress(data, encoding, level=None):
+    """Сжимает байты указанным алгоритмом."""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11 if level is None else level)
+    # mtime=0 делает результат детерминированным для одинакового входа.
+    return gzip.compress(data, compresslevel=level or 9, mtime=0)
+
+
+def parse_accept_encoding(header):
+    """Возвращает множество кодировок, которые принимает клиент."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    if '*' in accepted:
+        accepted.update(available_encodings())
+    return accepted
+
+
+def choose_encoding(header, candidates=None):
+    """Выбирает лучшую кодировку из ``candidates`` для Accept-Encoding."""
+    accepted = parse_accept_encoding(header or '')
+    for encoding in candidates or available_encodings():
+        if encoding in accepted:
+            return encoding
+    return None
+
+
+def is_compressible_name(name):
+    return name.lower().endswith(COMPRESSIBLE_EXTENSIONS)
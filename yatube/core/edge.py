@@ -0,0 +1,85 @@
+import logging
+from functools import wraps
+
+from django.conf import settings
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+from .tasks import enqueue, task
+
+logger = logging.getLogger(__name__)
+SURROGATE_KEY_HEADER = 'Surrogate-Key'
+PURGE_TIMEOUT = 5
+
+
+def is_shared(request, response):
+    """Ответ одинаков для всех анонимных посетителей.
+
+    Страницы с CSRF-токеном, установкой cookie или данными пользователя
+    в общий кеш не попадают.
+    """
+    return (
+        request.method in ('GET', 'HEAD')
+        and response.status_code == 200
+        and not request.user.is_authenticated
+        and not request.META.get('CSRF_COOKIE_USED')
+        and not response.cookies
+    )
+
+
+def edge_cache(*tags):
+    """Разрешает прокси перед приложением кешировать ответ анонимам.
+
+    Ответ помечается ``s-maxage`` и ``stale-while-revalidate`` из
+    ``EDGE_CACHE_MAX_AGE`` и ``EDGE_CACHE_STALE`` и ключами для очистки
+    в заголовке Surrogate-Key. Ключи — шаблоны с аргументами view,
+    например ``'group-{slug}'``. Остальные ответы помечаются ``private``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            patch_vary_headers(response, ('Cookie',))
+            if not is_shared(request, response):
+                patch_cache_control(response, private=True)
+                return response
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=0,
+                s_maxage=settings.EDGE_CACHE_MAX_AGE,
+                stale_while_revalidate=settings.EDGE_CACHE_STALE,
+            )
+            response[SURROGATE_KEY_HEADER] = ' '.join(
+                tag.format(**kwargs) for tag in tags
+            )
+            return response
+        return wrapper
+    return decorator
+
+
+def purge_enabled():
+    return bool(settings.EDGE_PURGE_URL)
+
+
+def purge(*tags):
+    """Ставит в очередь очистку кеша прокси по ключам ``tags``."""
+    if purge_enabled() and tags:
+        enqueue('core.purge_edge_cache', tags=sorted(set(tags)))
+
+
+@task('core.purge_edge_cache')
+def purge_edge_cache(tags):
+    # urllib.request импортируется долго, а нужен только обработчику
+    # задач.
+    from urllib.request import Request, urlopen
+
+    request = Request(
+        settings.EDGE_PURGE_URL,
+        method='PURGE',
+        headers={SURROGATE_KEY_HEADER: ' '.join(tags)},
+    )
+    with urlopen(request, timeout=PURGE_TIMEOUT) as response:
+        logger.info(
+            'Кеш прокси очищен по ключам %s: %s',
+            ' '.join(tags), response.read().decode(),
+        )
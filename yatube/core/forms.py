@@ -0,0 +1,11 @@
+from django import forms
+from django.conf import settings
+
+
+class SamplingProfilerForm(forms.Form):
+    seconds = forms.IntegerField(
+        label='Длительность, секунд',
+        min_value=1,
+        max_value=settings.SAMPLING_PROFILER_MAX_SECONDS,
+        initial=30,
+    )
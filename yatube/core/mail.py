@@ -0,0 +1,121 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.utils import timezone
+
+from .models import OutboundEmail
+
+
+def serialize_message(message):
+    attachments = []
+    for filename, content, mimetype in message.attachments:
+        if isinstance(content, str):
+            content = content.encode()
+        attachments.append(
+            (filename, base64.b64encode(content).decode(), mimetype)
+        )
+    return json.dumps({
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': attachments,
+    })
+
+
+def deserialize_message(email):
+    data = json.loads(email.message_data)
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+    )
+    for filename, content, mimetype in data['attachments']:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Почтовый бэкенд, который только ставит письма в очередь."""
+
+    def send_messages(self, email_messages):
+        emails = [
+            OutboundEmail(
+                subject=message.subject,
+                body=message.body,
+                from_email=message.from_email,
+                message_data=serialize_message(message),
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        OutboundEmail.objects.bulk_create(emails)
+        return len(emails)
+
+
+def retry_delay(attempts):
+    """Экспоненциальная задержка перед следующей попыткой."""
+    return timedelta(
+        seconds=settings.EMAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1)
+    )
+
+
+def mark_failed(email, error, now):
+    email.last_error = repr(error)
+    email.next_attempt_at = now + retry_delay(email.attempts)
+
+
+def deliver_queued(batch_size=100):
+    """Отправляет пачку писем из очереди через одно соединение.
+
+    Если соединение не открылось, вся пачка считается неудачной
+    попыткой. Возвращает количество отправленных и неотправленных писем.
+    """
+    now = timezone.now()
+    emails = list(OutboundEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+        next_attempt_at__lte=now,
+    )[:batch_size])
+    if not emails:
+        return 0, 0
+    for email in emails:
+        email.attempts += 1
+    sent = failed = 0
+    connection = get_connection(settings.EMAIL_QUEUE_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            mark_failed(email, error, now)
+        failed = len(emails)
+    else:
+        try:
+            for email in emails:
+                try:
+                    connection.send_messages([deserialize_message(email)])
+                except Exception as error:
+                    mark_failed(email, error, now)
+                    failed += 1
+                else:
+                    email.sent_at = timezone.now()
+                    email.last_error = ''
+                    sent += 1
+        finally:
+            connection.close()
+    OutboundEmail.objects.bulk_update(
+        emails, ('attempts', 'next_attempt_at', 'sent_at', 'last_error')
+    )
+    return sent, failed
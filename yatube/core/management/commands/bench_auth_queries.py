@@ -0,0 +1,54 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+User = get_user_model()
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+URL_NAMES = ('posts:follow_index', 'posts:post_create', 'about:author')
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает среднее число SQL-запросов на авторизованный запрос '
+        'для разных хранилищ сессий. Данные создаются во временной '
+        'транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Количество запросов к каждой странице.',
+        )
+        parser.add_argument(
+            '--engines', nargs='+', default=list(SESSION_ENGINES),
+            choices=list(SESSION_ENGINES),
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"Хранилище":<16}{"Запросов на страницу":>22}')
+        for name in options['engines']:
+            with override_settings(SESSION_ENGINE=SESSION_ENGINES[name]):
+                average = self.measure(options['requests'])
+            self.stdout.write(f'{name:<16}{average:>22.2f}')
+
+    def measure(self, requests):
+        with transaction.atomic():
+            user = User.objects.create_user(username='bench-auth-queries')
+            client = Client()
+            client.force_login(user)
+            urls = [reverse(name) for name in URL_NAMES]
+            for url in urls:
+                client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                for _ in range(requests):
+                    for url in urls:
+                        client.get(url)
+            transaction.set_rollback(True)
+        return len(queries) / (requests * len(urls))
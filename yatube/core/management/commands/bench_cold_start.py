@@ -0,0 +1,35 @@
+import statistics
+
+from django.core.management.base import BaseCommand
+
+from core.startup import SCENARIOS, run_scenario
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время холодного старта: каждый сценарий запускается '
+        'в новом интерпретаторе несколько раз.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs', type=int, default=5,
+            help='Количество запусков каждого сценария.',
+        )
+        parser.add_argument(
+            '--scenarios', nargs='+', default=list(SCENARIOS),
+            choices=list(SCENARIOS),
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"Сценарий":<16}{"минимум, мс":>14}'
+                          f'{"медиана, мс":>14}')
+        for name in options['scenarios']:
+            timings = [
+                run_scenario(name)[0] * 1000
+                for _ in range(options['runs'])
+            ]
+            self.stdout.write(
+                f'{name:<16}{min(timings):>14.1f}'
+                f'{statistics.median(timings):>14.1f}'
+            )
@@ -0,0 +1,28 @@
+from wsgiref.simple_server import make_server
+
+from django.core.management.base import BaseCommand
+from django.core.servers.basehttp import get_internal_wsgi_application
+
+from core.proxy import CachingProxy
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает приложение за локальным кеширующим прокси, чтобы '
+        'проверить заголовки Cache-Control и очистку по EDGE_PURGE_URL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8080)
+
+    def handle(self, *args, **options):
+        proxy = CachingProxy(get_internal_wsgi_application())
+        server = make_server(options['host'], options['port'], proxy)
+        self.stdout.write(
+            f'Прокси слушает http://{options["host"]}:{options["port"]}/'
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
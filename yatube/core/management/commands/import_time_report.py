@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+
+from core.startup import SCENARIOS, parse_importtime, run_scenario
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает сценарий старта в новом интерпретаторе с '
+        '-X importtime и показывает самые долгие импорты.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario', choices=list(SCENARIOS), default='wsgi',
+        )
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--prefix', nargs='+', default=(),
+            help='Только модули с этими префиксами, например '
+                 'posts core users.',
+        )
+
+    def handle(self, *args, **options):
+        _, output = run_scenario(options['scenario'], '-X', 'importtime')
+        modules = parse_importtime(output)
+        total = sum(module['self'] for module in modules)
+        prefixes = tuple(options['prefix'])
+        if prefixes:
+            modules = [
+                module for module in modules
+                if module['name'].startswith(prefixes)
+            ]
+        self.stdout.write(
+            f'Модулей: {len(modules)}, импорт всего: {total / 1000:.1f} мс'
+        )
+        self.stdout.write('Время вместе с вложенными импортами:')
+        self.write_top(modules, 'cumulative', options['limit'])
+        self.stdout.write('Собственное время модуля:')
+        self.write_top(modules, 'self', options['limit'])
+
+    def write_top(self, modules, field, limit):
+        modules = sorted(modules, key=lambda module: module[field],
+                         reverse=True)
+        for module in modules[:limit]:
+            self.stdout.write(
+                f'{module[field] / 1000:>9.1f} мс  {module["name"]}'
+            )
@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.tasks import run_tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди. '
+        'С --loop работает постоянно, как фоновый обработчик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=100,
+            help='Количество задач, выбираемых из очереди за раз.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с.',
+        )
+        parser.add_argument('--interval', type=float, default=1)
+
+    def handle(self, *args, **options):
+        while True:
+            count = run_tasks(options['limit'])
+            if count:
+                self.stdout.write(f'Выполнено задач: {count}')
+            if count == options['limit']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
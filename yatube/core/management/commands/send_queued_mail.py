@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import deliver_queued
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками через одно соединение. '
+        'С --loop работает постоянно, как фоновый обработчик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Количество писем, отправляемых через одно соединение.',
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с.',
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = deliver_queued(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(
+                    f'Отправлено писем: {sent}, с ошибкой: {failed}'
+                )
+            if sent + failed == options['batch_size']:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,68 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+def read_samples(path):
+    """Записи журнала и его архивов ротации, строка за строкой."""
+    paths = [path] + [
+        f'{path}.{number}'
+        for number in range(1, settings.SQL_PROFILING_LOG_BACKUPS + 1)
+    ]
+    for current in paths:
+        if not os.path.isfile(current):
+            continue
+        with open(current, encoding='utf-8') as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+class Command(BaseCommand):
+    help = (
+        'Сводка по журналу медленных запросов SQL_PROFILING_LOG: '
+        'запросы с наибольшим суммарным временем и их планы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=10)
+        parser.add_argument(
+            '--view', help='Только запросы view с этим именем.'
+        )
+
+    def handle(self, *args, **options):
+        offenders = {}
+        for sample in read_samples(settings.SQL_PROFILING_LOG):
+            if options['view'] and sample['view'] != options['view']:
+                continue
+            key = (sample['view'], sample['sql'])
+            stats = offenders.setdefault(key, {
+                'count': 0, 'total': 0, 'slowest': sample,
+            })
+            stats['count'] += 1
+            stats['total'] += sample['duration_ms']
+            if sample['duration_ms'] > stats['slowest']['duration_ms']:
+                stats['slowest'] = sample
+        if not offenders:
+            self.stdout.write('Медленных запросов нет')
+            return
+        top = sorted(
+            offenders.items(), key=lambda item: item[1]['total'], reverse=True
+        )[:options['limit']]
+        for (view, sql), stats in top:
+            slowest = stats['slowest']
+            self.stdout.write(
+                f'{view}: {stats["count"]} раз, всего '
+                f'{stats["total"]:.1f} мс, среднее '
+                f'{stats["total"] / stats["count"]:.1f} мс, максимум '
+                f'{slowest["duration_ms"]:.1f} мс'
+            )
+            self.stdout.write(f'  {sql}')
+            for line in slowest.get('plan') or ():
+                self.stdout.write(f'  план: {line}')
+            for frame in slowest.get('stack') or ():
+                self.stdout.write(f'  стек: {frame}')
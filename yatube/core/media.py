@@ -0,0 +1,82 @@
+import os
+import re
+from email.utils import formatdate
+
+from django.conf import settings
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+BLOCK_SIZE = 64 * 1024
+
+
+def file_etag(stat):
+    """Сильный ETag файла.
+
+    Загруженные файлы не перезаписываются: новая картинка получает новое
+    имя, поэтому размер и время изменения однозначно задают содержимое.
+    """
+    return '"{:x}-{:x}"'.format(stat.st_mtime_ns, stat.st_size)
+
+
+def last_modified(stat):
+    return formatdate(stat.st_mtime, usegmt=True)
+
+
+def find_media(path):
+    """Имя публичного файла относительно MEDIA_ROOT и полный путь к нему
+    или None.
+
+    Отдаются только файлы из каталогов MEDIA_PUBLIC_DIRS; скрытые файлы
+    и выход за пределы MEDIA_ROOT запрещены.
+    """
+    if any(part.startswith('.') for part in path.split('/')):
+        return None
+    root = os.path.realpath(settings.MEDIA_ROOT)
+    full_path = os.path.realpath(os.path.join(root, path))
+    name = os.path.relpath(full_path, root).replace(os.sep, '/')
+    if not name.startswith(tuple(settings.MEDIA_PUBLIC_DIRS)):
+        return None
+    if not os.path.isfile(full_path):
+        return None
+    return name, full_path
+
+
+def parse_range(header, size):
+    """Один диапазон из заголовка Range: (начало, конец включительно).
+
+    Возвращает None, если заголовок не задан или содержит несколько
+    диапазонов (тогда отдаётся весь файл), и бросает ValueError для
+    диапазона за пределами файла.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    start, end = match.groups()
+    if not start and not end:
+        return None
+    if not start:
+        length = int(end)
+        if not length:
+            raise ValueError('Пустой диапазон')
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start > end:
+        raise ValueError('Диапазон за пределами файла')
+    return start, end
+
+
+class RangeFile:
+    """Часть открытого файла для FileResponse."""
+
+    def __init__(self, file, start, end):
+        file.seek(start)
+        self.file = file
+        self.remaining = end - start + 1
+
+    def read(self, size=BLOCK_SIZE):
+        data = self.file.read(min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
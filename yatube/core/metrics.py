@@ -0,0 +1,189 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_counters = defaultdict(float)
+_gauges = {}
+_state = {'pid': None, 'file': None, 'dirty': False, 'flusher': None}
+
+# Описания счётчиков для /metrics. Счётчики без описания тоже
+# выводятся, но без строки HELP.
+DESCRIPTIONS = {
+    'posts_created': 'Созданные посты',
+    'comments_added': 'Добавленные комментарии',
+    'follows': 'Подписки и отписки',
+    'cache_requests': 'Обращения к кешу по префиксу ключа',
+    'thumbnail_renders': 'Созданные миниатюры картинок',
+    'paginator_counts': 'Подсчёты строк для пагинатора',
+    'ratelimit_decisions': 'Решения ограничителя запросов',
+}
+
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+
+def _check_process():
+    """После fork счётчики родителя не переносятся в дочерний процесс:
+    их уже учитывает файл родителя."""
+    pid = os.getpid()
+    if _state['pid'] != pid:
+        _counters.clear()
+        _state.update(
+            pid=pid, file=f'{pid}-{time.time_ns()}.json', dirty=False
+        )
+
+
+def _flush_periodically(pid):
+    """Раз в METRICS_FLUSH_INTERVAL секунд пишет изменившиеся счётчики,
+    в том числе когда процесс простаивает и новых событий нет."""
+    while _state['pid'] == pid:
+        time.sleep(settings.METRICS_FLUSH_INTERVAL)
+        directory = settings.METRICS_MULTIPROCESS_DIR
+        with _lock:
+            if directory and _state['dirty'] and _state['pid'] == pid:
+                _flush(directory)
+
+
+def _start_flusher():
+    """Поток записи счётчиков; после fork его нужно запустить заново."""
+    pid = _state['pid']
+    if _state['flusher'] != pid:
+        _state['flusher'] = pid
+        threading.Thread(
+            target=_flush_periodically, args=(pid,),
+            name='metrics-flush', daemon=True,
+        ).start()
+
+
+def increment(name, value=1, **labels):
+    """Увеличивает счётчик ``name`` с метками ``labels``."""
+    with _lock:
+        _check_process()
+        _counters[_key(name, labels)] += value
+        if settings.METRICS_MULTIPROCESS_DIR:
+            _state['dirty'] = True
+            _start_flusher()
+
+
+def cache_lookup(prefix, hits=0, misses=0):
+    """Учитывает попадания и промахи кеша для ключей с префиксом."""
+    if hits:
+        increment('cache_requests', int(hits), prefix=prefix, result='hit')
+    if misses:
+        increment(
+            'cache_requests', int(misses), prefix=prefix, result='miss'
+        )
+
+
+def get_value(name, **labels):
+    """Значение счётчика в текущем процессе."""
+    return _counters.get(_key(name, labels), 0)
+
+
+def register_gauge(name, description, collect):
+    """Показатель, который вычисляется функцией ``collect`` при каждом
+    чтении /metrics, например длина очереди в базе."""
+    _gauges[name] = (description, collect)
+
+
+def _flush(directory):
+    """Пишет счётчики процесса в его файл в METRICS_MULTIPROCESS_DIR.
+
+    Файл заменяется целиком, поэтому читатель не видит его наполовину
+    записанным.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, _state['file'])
+    rows = [
+        [name, dict(labels), value]
+        for (name, labels), value in _counters.items()
+    ]
+    with open(path + '.tmp', 'w') as output:
+        json.dump(rows, output)
+    os.replace(path + '.tmp', path)
+    _state['dirty'] = False
+
+
+def flush():
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if directory and _state['pid'] == os.getpid():
+        with _lock:
+            _flush(directory)
+
+
+atexit.register(flush)
+
+
+def collect_counters():
+    """Счётчики всех процессов: из файлов METRICS_MULTIPROCESS_DIR
+    или, без него, только текущего процесса."""
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if not directory:
+        with _lock:
+            return dict(_counters)
+    flush()
+    totals = defaultdict(float)
+    if not os.path.isdir(directory):
+        return totals
+    for entry in os.scandir(directory):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            with open(entry.path) as source:
+                rows = json.load(source)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in rows:
+            totals[_key(name, labels)] += value
+    return totals
+
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    pairs = []
+    for name, value in labels:
+        value = (
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n')
+        )
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+
+def format_value(value):
+    """Значение без потери точности: целые — без дробной части."""
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def render():
+    """Счётчики и показатели в текстовом формате Prometheus."""
+    by_name = defaultdict(list)
+    for (name, labels), value in sorted(collect_counters().items()):
+        by_name[name].append((labels, value))
+    lines = []
+    for name, samples in by_name.items():
+        metric = f'{settings.METRICS_PREFIX}{name}_total'
+        if name in DESCRIPTIONS:
+            lines.append(f'# HELP {metric} {DESCRIPTIONS[name]}')
+        lines.append(f'# TYPE {metric} counter')
+        for labels, value in samples:
+            lines.append(
+                f'{metric}{format_labels(labels)} {format_value(value)}'
+            )
+    for name, (description, collect) in sorted(_gauges.items()):
+        metric = f'{settings.METRICS_PREFIX}{name}'
+        lines.append(f'# HELP {metric} {description}')
+        lines.append(f'# TYPE {metric} gauge')
+        lines.append(f'{metric} {format_value(collect())}')
+    return '\n'.join(lines) + '\n'
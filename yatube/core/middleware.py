@@ -0,0 +1,130 @@
+import hashlib
+import re
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+
+from . import metrics
+from .compression import MIN_COMPRESS_SIZE, brotli, choose_encoding, compress
+
+COMPRESSED_CACHE_TIMEOUT = 300
+RE_PRESERVED = re.compile(
+    r'(<(pre|textarea|script|style)\b.*?</\2\s*>)', re.IGNORECASE | re.DOTALL
+)
+RE_WHITESPACE = re.compile(r'\s*\n\s*')
+
+
+def minify_html(html):
+    """Схлопывает пробелы в HTML, не трогая pre, textarea, script и style."""
+    parts = RE_PRESERVED.split(html)
+    result = []
+    # split с двумя группами даёт тройки: текст, блок, имя тега.
+    for index in range(0, len(parts), 3):
+        result.append(RE_WHITESPACE.sub('\n', parts[index]))
+        if index + 1 < len(parts):
+            result.append(parts[index + 1])
+    return ''.join(result)
+
+
+def compress_stream(chunks, encoding, level):
+    """Сжимает потоковый ответ по мере отдачи частей."""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        compress_chunk, finish = compressor.process, compressor.finish
+    else:
+        # wbits=31 — формат gzip с заголовком и контрольной суммой.
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        compress_chunk, finish = compressor.compress, compressor.flush
+    for chunk in chunks:
+        data = compress_chunk(chunk)
+        if data:
+            yield data
+    yield finish()
+
+
+def is_cacheable(response):
+    """Ответ закеширован в кеше страниц и будет отдаваться повторно."""
+    return 'max-age' in response.get('Cache-Control', '') and not (
+        'private' in response.get('Cache-Control', '')
+    )
+
+
+class CompressionMiddleware:
+    """Сжимает ответы gzip или brotli согласно ``COMPRESSION_LEVELS``.
+
+    HTML перед сжатием можно очистить от лишних пробелов
+    (``COMPRESSION_MINIFY_HTML``). Сжатые байты ответов из кеша страниц
+    сохраняются в кеше по хешу содержимого, поэтому повторные попадания
+    в кеш не сжимаются заново.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0]
+        levels = settings.COMPRESSION_LEVELS.get(content_type.strip())
+        if levels is None:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None or encoding not in levels:
+            return response
+        level = levels[encoding]
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding, level
+            )
+            del response['Content-Length']
+        elif not self.compress_content(response, content_type, encoding,
+                                       level):
+            return response
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def compress_content(self, response, content_type, encoding, level):
+        if len(response.content) < MIN_COMPRESS_SIZE:
+            return False
+        minify = (
+            settings.COMPRESSION_MINIFY_HTML and content_type == 'text/html'
+        )
+        key = None
+        if is_cacheable(response):
+            digest = hashlib.md5(response.content).hexdigest()
+            key = 'compressed:{}:{}:{}:{}'.format(
+                encoding, level, int(minify), digest
+            )
+            compressed = cache.get(key)
+            metrics.cache_lookup(
+                'compressed',
+                hits=compressed is not None,
+                misses=compressed is None,
+            )
+            if compressed is not None:
+                self.set_content(response, compressed)
+                return True
+        content = response.content
+        if minify:
+            content = minify_html(
+                content.decode(response.charset)
+            ).encode(response.charset)
+        compressed = compress(content, encoding, level)
+        if len(compressed) >= len(response.content):
+            return False
+        if key is not None:
+            cache.set(key, compressed, COMPRESSED_CACHE_TIMEOUT)
+        self.set_content(response, compressed)
+        return True
+
+    @staticmethod
+    def set_content(response, content):
+        response.content = content
+        response['Content-Length'] = str(len(content))
@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:31
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboundEmail',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subject', models.TextField(verbose_name='Тема')),
+                ('body', models.TextField(verbose_name='Текст')),
+                ('from_email', models.CharField(max_length=254, verbose_name='Отправитель')),
+                ('message_data', models.TextField(verbose_name='Получатели, заголовки и вложения в JSON')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток отправки')),
+                ('next_attempt_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Следующая попытка')),
+                ('sent_at', models.DateTimeField(blank=True, null=True, verbose_name='Отправлено')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'Письмо в очереди',
+                'verbose_name_plural': 'Очередь писем',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:32
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, verbose_name='Задача')),
+                ('payload', models.TextField(default='{}', verbose_name='Аргументы в JSON')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('run_after', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Выполнить после')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='Попыток')),
+                ('last_error', models.TextField(blank=True, verbose_name='Последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'Фоновая задача',
+                'verbose_name_plural': 'Фоновые задачи',
+                'ordering': ['id'],
+            },
+        ),
+    ]
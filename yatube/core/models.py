@@ -0,0 +1,55 @@
+from django.db import models
+from django.utils import timezone
+
+
+class OutboundEmail(models.Model):
+    """Письмо в очереди на отправку.
+
+    Письмо сохраняется в запросе, а отправляет его команда
+    send_queued_mail пачками через одно соединение.
+    """
+    subject = models.TextField('Тема')
+    body = models.TextField('Текст')
+    from_email = models.CharField('Отправитель', max_length=254)
+    message_data = models.TextField(
+        'Получатели, заголовки и вложения в JSON'
+    )
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField('Попыток отправки', default=0)
+    next_attempt_at = models.DateTimeField(
+        'Следующая попытка',
+        default=timezone.now,
+        db_index=True
+    )
+    sent_at = models.DateTimeField('Отправлено', blank=True, null=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self):
+        return self.subject
+
+
+class Task(models.Model):
+    """Фоновая задача, выполняемая командой run_tasks."""
+    name = models.CharField('Задача', max_length=100)
+    payload = models.TextField('Аргументы в JSON', default='{}')
+    created = models.DateTimeField('Создана', auto_now_add=True)
+    run_after = models.DateTimeField(
+        'Выполнить после',
+        default=timezone.now,
+        db_index=True
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,117 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import (
+    get_cache_key, has_vary_header, learn_cache_key, patch_response_headers
+)
+
+from . import metrics
+
+POLL_INTERVAL = 0.05
+
+
+def should_cache(request, response):
+    """Те же условия, что у cache_page: успешный обычный ответ без
+    ``private``, не ставящий cookie посетителю без cookie."""
+    if response.streaming or response.status_code != 200:
+        return False
+    if 'private' in response.get('Cache-Control', ''):
+        return False
+    return not (
+        not request.COOKIES
+        and response.cookies
+        and has_vary_header(response, 'Cookie')
+    )
+
+
+def lookup(request, key_prefix):
+    key = get_cache_key(request, key_prefix, 'GET', cache=cache)
+    return cache.get(key) if key else None
+
+
+def record(key_prefix, result):
+    metrics.increment(
+        'cache_requests', prefix=f'page:{key_prefix}', result=result
+    )
+
+
+def render_and_store(request, view, args, kwargs, timeout, key_prefix):
+    """Вызывает view и сохраняет ответ вместе со временем, до которого
+    он считается свежим."""
+    response = view(request, *args, **kwargs)
+    if callable(getattr(response, 'render', None)):
+        response = response.render()
+    if should_cache(request, response):
+        patch_response_headers(response, timeout)
+        lifetime = timeout + settings.PAGE_CACHE_STALE
+        key = learn_cache_key(
+            request, response, lifetime, key_prefix, cache=cache
+        )
+        cache.set(key, (response, time.time() + timeout), lifetime)
+    return response
+
+
+def wait_for_entry(request, key_prefix, lock_key):
+    """Ждёт до PAGE_CACHE_WAIT секунд, пока взявший блокировку сохранит
+    страницу. Возвращает запись кеша или None."""
+    deadline = time.monotonic() + settings.PAGE_CACHE_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = lookup(request, key_prefix)
+        if entry is not None or cache.get(lock_key) is None:
+            return entry
+    return None
+
+
+def serve_stale_or_render(request, view, args, kwargs, entry, timeout,
+                          key_prefix):
+    """Устаревшую или отсутствующую страницу пересчитывает только
+    запрос, взявший блокировку; остальные получают прежнюю копию или
+    ждут новую."""
+    lock_key = f'pagecache-lock:{key_prefix}:{request.build_absolute_uri()}'
+    if cache.add(lock_key, 1, settings.PAGE_CACHE_LOCK_TIMEOUT):
+        record(key_prefix, 'miss')
+        try:
+            return render_and_store(
+                request, view, args, kwargs, timeout, key_prefix
+            )
+        finally:
+            cache.delete(lock_key)
+    if entry is not None:
+        record(key_prefix, 'stale')
+        return entry[0]
+    entry = wait_for_entry(request, key_prefix, lock_key)
+    if entry is not None:
+        record(key_prefix, 'hit')
+        return entry[0]
+    record(key_prefix, 'miss')
+    return view(request, *args, **kwargs)
+
+
+def coalesced_cache_page(timeout, key_prefix=''):
+    """Замена ``cache_page``, при которой истёкшую страницу пересчитывает
+    только один процесс.
+
+    Первые ``timeout`` секунд ответ отдаётся из кеша как обычно. Ещё
+    PAGE_CACHE_STALE секунд после этого копия считается устаревшей:
+    запрос, первым взявший блокировку в кеше, заново вызывает view, а
+    остальные в это время получают устаревшую копию. Если копии нет
+    совсем, остальные до PAGE_CACHE_WAIT секунд ждут, пока её сохранит
+    взявший блокировку.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            entry = lookup(request, key_prefix)
+            if entry is not None and entry[1] > time.time():
+                record(key_prefix, 'hit')
+                return entry[0]
+            return serve_stale_or_render(
+                request, view, args, kwargs, entry, timeout, key_prefix
+            )
+        return wrapper
+    return decorator
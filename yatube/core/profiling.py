@@ -0,0 +1,326 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+from logging.handlers import RotatingFileHandler
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('core.profiling.sql')
+SAMPLING_CACHE_KEY = 'core:sampling-profiler'
+# Как часто процесс проверяет в кеше, включён ли профилировщик.
+SAMPLING_POLL_INTERVAL = 1
+STACK_DEPTH = 5
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ANALYZE ',
+    'mysql': 'EXPLAIN ',
+}
+
+
+def get_logger():
+    """Логгер медленных запросов с ротацией файла SQL_PROFILING_LOG.
+
+    Обработчик создаётся при первом обращении, чтобы выключенное
+    профилирование не создавало файлов.
+    """
+    if not logger.handlers:
+        os.makedirs(os.path.dirname(settings.SQL_PROFILING_LOG), exist_ok=True)
+        handler = RotatingFileHandler(
+            settings.SQL_PROFILING_LOG,
+            maxBytes=settings.SQL_PROFILING_LOG_MAX_BYTES,
+            backupCount=settings.SQL_PROFILING_LOG_BACKUPS,
+            encoding='utf-8',
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def stack_summary():
+    """Последние кадры стека из кода проекта, без библиотек."""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-2]
+        if frame.filename.startswith(settings.BASE_DIR)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith(os.path.join('core', 'profiling.py'))
+    ]
+    return [
+        '{}:{} in {}'.format(
+            os.path.relpath(frame.filename, settings.BASE_DIR),
+            frame.lineno, frame.name,
+        )
+        for frame in frames[-STACK_DEPTH:]
+    ]
+
+
+def explain(connection, sql, params):
+    """План запроса или None, если СУБД или запрос не поддерживаются."""
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    if prefix is None or not sql.lstrip().upper().startswith('SELECT'):
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            return [
+                ' '.join(str(value) for value in row)
+                for row in cursor.fetchall()
+            ]
+    except Exception as error:
+        return [f'EXPLAIN не выполнен: {error!r}']
+
+
+class SlowQueryRecorder:
+    """Обёртка execute_wrapper, записывающая запросы дольше порога.
+
+    Пока view запроса не определён или не входит в SQL_PROFILING_VIEWS,
+    запросы не записываются.
+    """
+
+    def __init__(self):
+        self.view = None
+        self.explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self.view is None or self.explaining:
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            if duration >= settings.SQL_PROFILING_THRESHOLD_MS:
+                self.record(sql, params, many, duration, context)
+
+    def record(self, sql, params, many, duration, context):
+        self.explaining = True
+        try:
+            plan = None if many else explain(
+                context['connection'], sql, params
+            )
+        finally:
+            self.explaining = False
+        get_logger().info(json.dumps({
+            'time': time.time(),
+            'view': self.view,
+            'duration_ms': round(duration, 3),
+            'sql': sql,
+            'params': None if many else [str(value) for value in params or ()],
+            'plan': plan,
+            'stack': stack_summary(),
+        }, ensure_ascii=False))
+
+
+class SQLProfilingMiddleware:
+    """Записывает медленные запросы view из SQL_PROFILING_VIEWS.
+
+    Включается настройкой SQL_PROFILING; запросы дольше
+    SQL_PROFILING_THRESHOLD_MS пишутся в SQL_PROFILING_LOG вместе с
+    планом выполнения и стеком вызова. Сводку по журналу выводит
+    команда sql_profile_report.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SQL_PROFILING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.sql_recorder = recorder = SlowQueryRecorder()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = f'{view_func.__module__}.{view_func.__name__}'
+        if view.startswith(tuple(settings.SQL_PROFILING_VIEWS)):
+            request.sql_recorder.view = view
+
+
+def frame_name(code):
+    """Имя кадра для свёрнутого стека: файл относительно проекта или
+    site-packages и функция."""
+    filename = code.co_filename
+    if filename.startswith(settings.BASE_DIR):
+        filename = os.path.relpath(filename, settings.BASE_DIR)
+    elif 'site-packages' in filename:
+        filename = filename.split('site-packages' + os.sep, 1)[-1]
+    else:
+        filename = os.path.basename(filename)
+    return f'{filename}:{code.co_name}'
+
+
+def collapse_stack(frame):
+    """Стек от корня к текущему кадру в формате flamegraph.pl."""
+    names = []
+    while frame is not None:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def write_collapsed(stacks, path):
+    with open(path, 'w', encoding='utf-8') as output:
+        for stack, count in stacks.most_common():
+            output.write(f'{stack} {count}\n')
+
+
+def read_collapsed(paths):
+    """Складывает свёрнутые стеки нескольких файлов."""
+    stacks = Counter()
+    for path in paths:
+        with open(path, encoding='utf-8') as collapsed:
+            for line in collapsed:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+class SamplingProfiler:
+    """Профилировщик на отдельном потоке.
+
+    Раз в SAMPLING_PROFILER_INTERVAL секунд снимает стеки потоков,
+    которые сейчас обрабатывают запрос к отслеживаемому view, и считает
+    одинаковые стеки. После ``until`` пишет их в SAMPLING_PROFILER_DIR
+    файлом свёрнутых стеков: ``<session>-<pid>.folded``, где session —
+    метка включения, общая для всех процессов.
+    """
+
+    def __init__(self, session, until, interval=None):
+        self.session = session
+        self.until = until
+        self.interval = interval or settings.SAMPLING_PROFILER_INTERVAL
+        self.threads = {}
+        self.stacks = Counter()
+        self.thread = threading.Thread(
+            target=self.run, name='sampling-profiler', daemon=True
+        )
+
+    @property
+    def path(self):
+        return os.path.join(
+            settings.SAMPLING_PROFILER_DIR,
+            f'{self.session}-{os.getpid()}.folded',
+        )
+
+    def start(self):
+        self.thread.start()
+
+    def is_running(self):
+        return self.thread.is_alive()
+
+    def track(self, view):
+        self.threads[threading.get_ident()] = view
+
+    def untrack(self):
+        self.threads.pop(threading.get_ident(), None)
+
+    def sample(self):
+        frames = sys._current_frames()
+        for thread_id, view in list(self.threads.items()):
+            frame = frames.get(thread_id)
+            if frame is not None:
+                self.stacks[f'{view};{collapse_stack(frame)}'] += 1
+
+    def run(self):
+        while time.time() < self.until:
+            time.sleep(self.interval)
+            self.sample()
+        if self.stacks:
+            os.makedirs(settings.SAMPLING_PROFILER_DIR, exist_ok=True)
+            write_collapsed(self.stacks, self.path)
+
+
+def start_sampling(seconds):
+    """Включает профилировщик во всех процессах на ``seconds`` секунд.
+
+    Процессы узнают об этом через кеш, поэтому для нескольких процессов
+    нужен общий бэкенд кеша. Возвращает метку сессии.
+    """
+    session = time.strftime('%Y%m%d-%H%M%S')
+    cache.set(
+        SAMPLING_CACHE_KEY, (session, time.time() + seconds), seconds
+    )
+    return session
+
+
+def stop_sampling():
+    cache.delete(SAMPLING_CACHE_KEY)
+
+
+def sampling_sessions():
+    """Сессии профилирования: метка -> файлы процессов."""
+    sessions = {}
+    if not os.path.isdir(settings.SAMPLING_PROFILER_DIR):
+        return sessions
+    for name in sorted(os.listdir(settings.SAMPLING_PROFILER_DIR)):
+        if name.endswith('.folded'):
+            session = name[:-len('.folded')].rsplit('-', 1)[0]
+            sessions.setdefault(session, []).append(
+                os.path.join(settings.SAMPLING_PROFILER_DIR, name)
+            )
+    return sessions
+
+
+class SamplingProfilerMiddleware:
+    """Запускает SamplingProfiler в процессе, когда его включили в
+    админке, и отмечает потоки с запросами к SAMPLING_PROFILER_VIEWS.
+
+    Кеш опрашивается не чаще раза в SAMPLING_POLL_INTERVAL секунд, так
+    что выключенный профилировщик почти ничего не стоит.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.profiler = None
+        self.checked = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        request.sampling_profiler = self.get_profiler()
+        try:
+            return self.get_response(request)
+        finally:
+            if request.sampling_profiler is not None:
+                request.sampling_profiler.untrack()
+
+    def get_profiler(self):
+        now = time.time()
+        if now - self.checked >= SAMPLING_POLL_INTERVAL:
+            with self.lock:
+                self.checked = now
+                self.poll(cache.get(SAMPLING_CACHE_KEY))
+        profiler = self.profiler
+        if profiler is not None and profiler.is_running():
+            return profiler
+        return None
+
+    def poll(self, state):
+        session, until = state or (None, 0)
+        profiler = self.profiler
+        if profiler is not None and profiler.is_running():
+            # Выключение или продление из админки.
+            profiler.until = until if session == profiler.session else 0
+            return
+        if until > time.time():
+            self.profiler = SamplingProfiler(session, until)
+            self.profiler.start()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.sampling_profiler is None:
+            return
+        view = f'{view_func.__module__}.{view_func.__name__}'
+        if view.startswith(tuple(settings.SAMPLING_PROFILER_VIEWS)):
+            request.sampling_profiler.track(view)
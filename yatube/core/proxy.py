@@ -0,0 +1,180 @@
+import re
+import time
+
+from .edge import SURROGATE_KEY_HEADER
+
+DIRECTIVE_RE = re.compile(r'([\w-]+)(?:=(\d+))?')
+HOP_HEADERS = {SURROGATE_KEY_HEADER.lower(), 'age'}
+
+
+def parse_cache_control(value):
+    return {
+        name.lower(): int(number) if number else True
+        for name, number in DIRECTIVE_RE.findall(value)
+    }
+
+
+def request_header(environ, name):
+    return environ.get('HTTP_' + name.upper().replace('-', '_'), '')
+
+
+class CachedResponse:
+    def __init__(self, status, headers, body, vary, tags, now):
+        cache_control = parse_cache_control(
+            dict(headers).get('Cache-Control', '')
+        )
+        self.status = status
+        self.headers = [
+            (name, value) for name, value in headers
+            if name.lower() not in HOP_HEADERS
+        ]
+        self.body = body
+        self.vary = vary
+        self.tags = tags
+        self.created = now
+        self.fresh_until = now + cache_control.get('s-maxage', 0)
+        self.stale_until = self.fresh_until + cache_control.get(
+            'stale-while-revalidate', 0
+        )
+
+
+class RefreshAfterResponse:
+    """Тело ответа, после отправки которого обновляется запись кеша.
+
+    WSGI-сервер вызывает ``close()``, когда ответ уже передан клиенту.
+    """
+
+    def __init__(self, body, refresh):
+        self.body = body
+        self.refresh = refresh
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        self.refresh()
+
+
+class CachingProxy:
+    """Локальная замена кеширующего обратного прокси (Varnish, CDN).
+
+    Кеширует ответы с ``public`` и ``s-maxage`` с учётом ``Vary``,
+    в окне ``stale-while-revalidate`` отдаёт устаревший ответ и
+    обновляет его после отправки. Запрос ``PURGE`` с заголовком
+    Surrogate-Key удаляет ответы с этими ключами. Кеш хранится в памяти
+    процесса и нужен для разработки и тестов.
+    """
+
+    def __init__(self, application, clock=time.monotonic):
+        self.application = application
+        self.clock = clock
+        self.entries = {}
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        if method == 'PURGE':
+            return self.purge(environ, start_response)
+        if method != 'GET':
+            return self.application(environ, start_response)
+        url = environ.get('PATH_INFO', '') + '?' + environ.get(
+            'QUERY_STRING', ''
+        )
+        entry = self.lookup(url, environ)
+        now = self.clock()
+        if entry is not None and now < entry.fresh_until:
+            return self.respond(start_response, entry, 'HIT')
+        if entry is not None and now < entry.stale_until:
+            body = self.respond(start_response, entry, 'STALE')
+            return RefreshAfterResponse(
+                body, lambda: self.fetch(url, environ)
+            )
+        entry = self.fetch(url, environ)
+        return self.respond(start_response, entry, 'MISS')
+
+    def lookup(self, url, environ):
+        for entry in self.entries.get(url, ()):
+            if all(
+                request_header(environ, name) == value
+                for name, value in entry.vary
+            ):
+                return entry
+        return None
+
+    def fetch(self, url, environ):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+
+        body = self.application(environ, start_response)
+        try:
+            content = b''.join(body)
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+        headers = response['headers']
+        header_values = {name.lower(): value for name, value in headers}
+        vary = [
+            name.strip()
+            for name in header_values.get('vary', '').split(',')
+            if name.strip()
+        ]
+        entry = CachedResponse(
+            response['status'],
+            headers,
+            content,
+            [(name, request_header(environ, name)) for name in vary],
+            set(header_values.get(SURROGATE_KEY_HEADER.lower(), '').split()),
+            self.clock(),
+        )
+        if self.is_storable(entry.status, header_values, vary):
+            self.store(url, entry)
+        return entry
+
+    @staticmethod
+    def is_storable(status, header_values, vary):
+        cache_control = parse_cache_control(
+            header_values.get('cache-control', '')
+        )
+        return (
+            status.startswith('200')
+            and cache_control.get('public')
+            and 's-maxage' in cache_control
+            and not cache_control.get('private')
+            and not cache_control.get('no-store')
+            and 'set-cookie' not in header_values
+            and '*' not in vary
+        )
+
+    def store(self, url, entry):
+        variants = [
+            cached for cached in self.entries.get(url, ())
+            if cached.vary != entry.vary
+        ]
+        self.entries[url] = variants + [entry]
+
+    def purge(self, environ, start_response):
+        tags = set(request_header(environ, SURROGATE_KEY_HEADER).split())
+        if not tags:
+            start_response('400 Bad Request', [('Content-Length', '0')])
+            return []
+        purged = 0
+        for url, variants in list(self.entries.items()):
+            kept = [entry for entry in variants if not entry.tags & tags]
+            purged += len(variants) - len(kept)
+            self.entries[url] = kept
+        body = str(purged).encode()
+        start_response('200 OK', [
+            ('Content-Type', 'text/plain'),
+            ('Content-Length', str(len(body))),
+        ])
+        return [body]
+
+    def respond(self, start_response, entry, result):
+        age = int(self.clock() - entry.created)
+        start_response(entry.status, entry.headers + [
+            ('Age', str(age)),
+            ('X-Cache', result),
+        ])
+        return [entry.body]
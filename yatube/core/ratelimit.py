@@ -0,0 +1,90 @@
+import math
+import time
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from . import metrics
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+RATE_PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60): ёмкость корзины и период её заполнения."""
+    count, _, period = rate.partition('/')
+    return int(count), RATE_PERIODS[period]
+
+
+def take_token(key, rate):
+    """Берёт жетон из корзины ``key``; False, если корзина пуста.
+
+    Состояние корзины — остаток жетонов и время последнего обращения —
+    хранится в кеше RATELIMIT_CACHE; лимит общий для всех процессов,
+    только если общий сам кеш. Чтение и запись не атомарны, поэтому при
+    одновременных запросах лимит соблюдается приблизительно.
+    """
+    capacity, period = parse_rate(rate)
+    cache = caches[settings.RATELIMIT_CACHE]
+    now = time.time()
+    state = cache.get(key)
+    tokens = capacity
+    if state is not None:
+        tokens, updated = state
+        tokens = min(capacity, tokens + (now - updated) * capacity / period)
+    allowed = tokens >= 1
+    if allowed:
+        tokens -= 1
+    cache.set(key, (tokens, now), period)
+    return allowed
+
+
+def get_identities(request):
+    """Адрес клиента, затем пользователь из сессии без запроса к auth_user.
+
+    Сессия читается, только если запрос прошёл проверку по адресу.
+    """
+    yield 'ip', request.META.get('REMOTE_ADDR', '')
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is not None:
+        yield 'user', user_id
+
+
+def ratelimit(name):
+    """Ограничивает частоту запросов на запись к представлению.
+
+    Лимиты задаются в ``RATELIMITS[name]`` отдельно для адреса и
+    пользователя. Декоратор ставится над остальными, чтобы отклонять
+    лишние запросы до любой работы с базой.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            limits = settings.RATELIMITS.get(name, {})
+            if request.method in SAFE_METHODS or not limits:
+                return view(request, *args, **kwargs)
+            for scope, identity in get_identities(request):
+                if scope not in limits:
+                    continue
+                key = f'ratelimit:{name}:{scope}:{identity}'
+                if not take_token(key, limits[scope]):
+                    metrics.increment(
+                        'ratelimit_decisions', view=name, result='rejected'
+                    )
+                    response = HttpResponse(
+                        'Слишком много запросов, попробуйте позже',
+                        status=HTTPStatus.TOO_MANY_REQUESTS,
+                    )
+                    capacity, period = parse_rate(limits[scope])
+                    response['Retry-After'] = math.ceil(period / capacity)
+                    return response
+            metrics.increment(
+                'ratelimit_decisions', view=name, result='allowed'
+            )
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.contrib.sessions.backends import cached_db, db
+
+from . import caching
+
+
+class SessionStore(cached_db.SessionStore):
+    """Хранилище ``cached_db``, которое обращается к кешу, только если
+    кеш SESSION_CACHE_ALIAS общий для всех процессов.
+
+    В кеше процесса выход или удаление сессии в одном процессе не
+    увидят остальные, и сессия оставалась бы действительной до конца
+    срока. Поэтому с таким кешем сессии читаются из базы, как в ``db``.
+    """
+
+    @property
+    def use_cache(self):
+        return caching.is_shared(settings.SESSION_CACHE_ALIAS)
+
+    def load(self):
+        if not self.use_cache:
+            return db.SessionStore.load(self)
+        return super().load()
+
+    def exists(self, session_key):
+        if not self.use_cache:
+            return db.SessionStore.exists(self, session_key)
+        return super().exists(session_key)
+
+    def save(self, must_create=False):
+        if not self.use_cache:
+            return db.SessionStore.save(self, must_create)
+        return super().save(must_create)
+
+    def delete(self, session_key=None):
+        if not self.use_cache:
+            return db.SessionStore.delete(self, session_key)
+        return super().delete(session_key)
@@ -0,0 +1,67 @@
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+SETUP = (
+    'import django\n'
+    'django.setup()\n'
+)
+FIRST_REQUEST = (
+    'from wsgiref.util import setup_testing_defaults\n'
+    'from yatube.wsgi import application\n'
+    'environ = {}\n'
+    'setup_testing_defaults(environ)\n'
+    'environ.update(HTTP_HOST="127.0.0.1", PATH_INFO="/")\n'
+    'b"".join(application(environ, lambda *args: None))\n'
+)
+# Сценарии запуска процесса: код, который выполняется в чистом
+# интерпретаторе с настройками проекта.
+SCENARIOS = {
+    'setup': SETUP,
+    'check': (
+        'from django.core.management import call_command\n'
+        + SETUP + 'call_command("check", verbosity=0)\n'
+    ),
+    'wsgi': 'from yatube.wsgi import application\n',
+    'first-request': FIRST_REQUEST,
+}
+
+
+def run_scenario(name, *options):
+    """Выполняет сценарий в новом процессе, возвращает время в секундах
+    и stderr."""
+    env = dict(
+        os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE
+    )
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, *options, '-c', SCENARIOS[name]],
+        cwd=settings.BASE_DIR,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    return time.perf_counter() - start, result.stderr
+
+
+def parse_importtime(output):
+    """Строки ``-X importtime``: модуль, собственное время и время
+    вместе с вложенными импортами в микросекундах."""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        if not self_time.strip().isdigit():
+            continue
+        modules.append({
+            'name': name.strip(),
+            'self': int(self_time),
+            'cumulative': int(cumulative),
+        })
+    return modules
@@ -0,0 +1,48 @@
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import (
+    MIN_COMPRESS_SIZE, available_encodings, compress, is_compressible_name
+)
+
+ENCODING_SUFFIXES = {'gzip': '.gz', 'br': '.br'}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем в имени файла и заранее сжатыми копиями.
+
+    Во время ``collectstatic`` рядом с каждым текстовым файлом (исходным и
+    хешированным) сохраняются ``.gz`` и, если установлен brotli, ``.br``.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            yield name, hashed_name, processed
+            if isinstance(processed, Exception):
+                continue
+            names.add(name)
+            if hashed_name:
+                names.add(hashed_name)
+        if dry_run:
+            return
+        for name in sorted(names):
+            if is_compressible_name(name):
+                self.compress_file(name)
+
+    def compress_file(self, name):
+        """Сохраняет сжатые копии файла, если они действительно меньше."""
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < MIN_COMPRESS_SIZE:
+            return
+        for encoding in available_encodings():
+            compressed = compress(content, encoding)
+            if len(compressed) >= len(content) * 0.95:
+                continue
+            compressed_name = name + ENCODING_SUFFIXES[encoding]
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(compressed))
@@ -0,0 +1,62 @@
+import json
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+registry = {}
+
+
+def task(name):
+    """Регистрирует функцию как фоновую задачу с именем ``name``."""
+    def decorator(function):
+        registry[name] = function
+        return function
+    return decorator
+
+
+def enqueue(name, run_after=None, **payload):
+    """Ставит задачу в очередь.
+
+    Запись создаётся в текущей транзакции, поэтому обработчик увидит
+    задачу не раньше, чем данные, которые её породили.
+    """
+    return Task.objects.create(
+        name=name,
+        payload=json.dumps(payload),
+        run_after=run_after or timezone.now(),
+    )
+
+
+def run_tasks(limit=100):
+    """Выполняет готовые к запуску задачи, возвращает их количество.
+
+    Выполненная задача удаляется, упавшая откладывается с растущей
+    задержкой, пока не исчерпает TASK_MAX_ATTEMPTS попыток.
+    """
+    autodiscover_modules('tasks')
+    tasks = list(Task.objects.filter(
+        run_after__lte=timezone.now(),
+        attempts__lt=settings.TASK_MAX_ATTEMPTS,
+    )[:limit])
+    for current in tasks:
+        try:
+            registry[current.name](**json.loads(current.payload))
+        except Exception as error:
+            logger.exception('Задача %s не выполнена', current.name)
+            current.attempts += 1
+            current.last_error = repr(error)
+            current.run_after = timezone.now() + timedelta(
+                seconds=settings.TASK_RETRY_DELAY * 2 ** current.attempts
+            )
+            current.save(
+                update_fields=('attempts', 'last_error', 'run_after')
+            )
+        else:
+            current.delete()
+    return len(tasks)
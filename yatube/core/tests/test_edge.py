@@ -0,0 +1,158 @@
+import json
+from unittest import mock
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.signals import request_finished
+from django.db import close_old_connections
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Task
+from core.proxy import CachingProxy
+from core.tasks import run_tasks
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class EdgeCacheHeadersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        cls.post = Post.objects.create(
+            author=cls.user, group=cls.group, text='Текст поста'
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_anonymous_pages_are_public(self):
+        """Анонимам страницы отдаются с s-maxage и ключами очистки"""
+        pages = {
+            reverse('posts:index'): 'posts',
+            reverse('posts:group_list', args=[self.group.slug]):
+                'group-test-slug',
+            reverse('posts:profile', args=[self.user.username]):
+                'profile-SomeUser',
+            reverse('posts:post_detail', args=[self.post.pk]):
+                f'post-{self.post.pk}',
+        }
+        for url, tag in pages.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                cache_control = response['Cache-Control']
+                self.assertIn('public', cache_control)
+                self.assertIn('s-maxage=20', cache_control)
+                self.assertIn('stale-while-revalidate=60', cache_control)
+                self.assertIn('Cookie', response['Vary'])
+                self.assertEqual(response['Surrogate-Key'], tag)
+
+    def test_authorized_pages_are_private(self):
+        """Страницы авторизованного пользователя в общий кеш не попадают"""
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('Cookie', response['Vary'])
+        self.assertFalse(response.has_header('Surrogate-Key'))
+
+    @override_settings(EDGE_PURGE_URL='http://127.0.0.1:8080/')
+    def test_post_change_queues_purge(self):
+        """Изменение поста ставит в очередь очистку его страниц"""
+        Task.objects.all().delete()
+        self.post.text = 'Новый текст'
+        self.post.save()
+        task = Task.objects.get(name='core.purge_edge_cache')
+        self.assertEqual(json.loads(task.payload)['tags'], [
+            'group-test-slug', 'groups', f'post-{self.post.pk}', 'posts',
+            'profile-SomeUser',
+        ])
+        with mock.patch('urllib.request.urlopen') as urlopen:
+            run_tasks()
+        request = urlopen.call_args[0][0]
+        self.assertEqual(request.get_method(), 'PURGE')
+        self.assertEqual(
+            request.get_header('Surrogate-key'),
+            ' '.join(json.loads(task.payload)['tags']),
+        )
+
+
+class CachingProxyTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        Post.objects.create(author=cls.user, text='Текст поста')
+
+    def setUp(self):
+        request_finished.disconnect(close_old_connections)
+        self.now = 0
+        self.proxy = CachingProxy(WSGIHandler(), clock=lambda: self.now)
+
+    def tearDown(self):
+        request_finished.connect(close_old_connections)
+        cache.clear()
+
+    def request(self, path, method='GET', **headers):
+        response = {}
+
+        def start_response(status, response_headers):
+            response['status'] = status
+            response['headers'] = dict(response_headers)
+
+        environ = {'REQUEST_METHOD': method, 'PATH_INFO': path, **headers}
+        setup_testing_defaults(environ)
+        body = self.proxy(environ, start_response)
+        response['body'] = b''.join(body)
+        if hasattr(body, 'close'):
+            body.close()
+        return response
+
+    def test_anonymous_page_served_from_proxy(self):
+        """Повторный запрос анонима отдаётся прокси без Django"""
+        self.assertEqual(self.request('/')['headers']['X-Cache'], 'MISS')
+        with mock.patch('posts.views.render') as render:
+            response = self.request('/')
+        render.assert_not_called()
+        self.assertEqual(response['headers']['X-Cache'], 'HIT')
+        self.assertIn('Текст поста', response['body'].decode())
+        self.assertNotIn('Surrogate-Key', response['headers'])
+
+    def test_stale_page_served_and_refreshed(self):
+        """Устаревшая страница отдаётся сразу и обновляется после ответа"""
+        self.request('/')
+        self.now = 30
+        Post.objects.create(author=self.user, text='Свежий пост')
+        cache.clear()
+        stale = self.request('/')
+        self.assertEqual(stale['headers']['X-Cache'], 'STALE')
+        self.assertNotIn('Свежий пост', stale['body'].decode())
+        fresh = self.request('/')
+        self.assertEqual(fresh['headers']['X-Cache'], 'HIT')
+        self.assertIn('Свежий пост', fresh['body'].decode())
+
+    def test_purge_by_surrogate_key(self):
+        """PURGE по ключу удаляет страницу из кеша прокси"""
+        self.request('/')
+        response = self.request(
+            '/', method='PURGE', HTTP_SURROGATE_KEY='posts'
+        )
+        self.assertEqual(response['body'], b'1')
+        self.assertEqual(self.request('/')['headers']['X-Cache'], 'MISS')
+
+    def test_variants_by_accept_encoding(self):
+        """Ответы с разным Accept-Encoding кешируются отдельно"""
+        self.request('/', HTTP_ACCEPT_ENCODING='gzip')
+        response = self.request('/')
+        self.assertEqual(response['headers']['X-Cache'], 'MISS')
+        self.assertNotIn('Content-Encoding', response['headers'])
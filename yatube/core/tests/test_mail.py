@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.mail import deliver_queued
+from core.models import OutboundEmail
+
+User = get_user_model()
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_QUEUE_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+)
+class EmailQueueTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        User.objects.create_user(
+            username='SomeUser', email='user@example.com', password='pass'
+        )
+
+    def request_password_reset(self):
+        Client().post(
+            reverse('users:password_reset_form'),
+            {'email': 'user@example.com'},
+        )
+
+    def test_password_reset_is_queued(self):
+        """Письмо сброса пароля ставится в очередь, а не отправляется"""
+        self.request_password_reset()
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.count(), 1)
+
+    def test_worker_delivers_queued_mail(self):
+        """Обработчик отправляет письма из очереди"""
+        self.request_password_reset()
+        self.request_password_reset()
+        self.assertEqual(deliver_queued(), (2, 0))
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(mail.outbox[0].to, ['user@example.com'])
+        self.assertFalse(
+            OutboundEmail.objects.filter(sent_at__isnull=True).exists()
+        )
+        self.assertEqual(deliver_queued(), (0, 0))
+
+    def test_failed_delivery_retried_later(self):
+        """Неотправленное письмо откладывается с растущей задержкой"""
+        self.request_password_reset()
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.send_messages',
+            side_effect=OSError('connection refused'),
+        ):
+            self.assertEqual(deliver_queued(), (0, 1))
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('connection refused', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+        self.assertEqual(deliver_queued(), (0, 0))
+
+    def test_connection_failure_retried_later(self):
+        """Если соединение не открылось, пачка откладывается, а не
+        роняет обработчик"""
+        self.request_password_reset()
+        self.request_password_reset()
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.open',
+            side_effect=OSError('connection refused'),
+        ):
+            self.assertEqual(deliver_queued(), (0, 2))
+        for email in OutboundEmail.objects.all():
+            self.assertEqual(email.attempts, 1)
+            self.assertIn('connection refused', email.last_error)
+            self.assertGreater(email.next_attempt_at, timezone.now())
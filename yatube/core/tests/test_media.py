@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.test import Client, TestCase, override_settings
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(TEMP_MEDIA_ROOT, 'posts'))
+        files = {
+            'posts/a.jpg': CONTENT,
+            'posts/картинка.jpg': CONTENT,
+            'secret.txt': b'secret',
+        }
+        for name, content in files.items():
+            with open(os.path.join(TEMP_MEDIA_ROOT, name), 'wb') as file:
+                file.write(content)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def test_file_served_with_strong_etag(self):
+        """Файл отдаётся целиком со строгим ETag и кешируется по нему"""
+        response = self.guest_client.get('/media/posts/a.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertFalse(response['ETag'].startswith('W/'))
+        response = self.guest_client.get(
+            '/media/posts/a.jpg', HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_requests(self):
+        """Диапазоны Range отдаются ответом 206"""
+        ranges = {
+            'bytes=0-9': (CONTENT[:10], f'bytes 0-9/{len(CONTENT)}'),
+            'bytes=1000-': (CONTENT[1000:], 'bytes 1000-1023/1024'),
+            'bytes=-4': (CONTENT[-4:], 'bytes 1020-1023/1024'),
+        }
+        for header, (body, content_range) in ranges.items():
+            with self.subTest(header=header):
+                response = self.guest_client.get(
+                    '/media/posts/a.jpg', HTTP_RANGE=header
+                )
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(b''.join(response.streaming_content), body)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(int(response['Content-Length']), len(body))
+        response = self.guest_client.get(
+            '/media/posts/a.jpg', HTTP_RANGE='bytes=5000-'
+        )
+        self.assertEqual(response.status_code, 416)
+        response = self.guest_client.get(
+            '/media/posts/a.jpg', HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"x"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_access_checks(self):
+        """Файлы вне публичных каталогов и обход пути недоступны"""
+        for path in ('/media/secret.txt', '/media/posts/../secret.txt',
+                     '/media/posts/missing.jpg'):
+            with self.subTest(path=path):
+                self.assertEqual(self.guest_client.get(path).status_code, 404)
+
+    def test_transfer_handed_to_frontend(self):
+        """С MEDIA_SENDFILE файл передаёт фронтенд-сервер"""
+        with self.settings(MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.guest_client.get('/media/posts/a.jpg')
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/a.jpg'
+        )
+        self.assertEqual(response.content, b'')
+        with self.settings(MEDIA_SENDFILE='x-sendfile'):
+            response = self.guest_client.get('/media/posts/a.jpg')
+        self.assertEqual(
+            response['X-Sendfile'],
+            os.path.join(os.path.realpath(TEMP_MEDIA_ROOT), 'posts', 'a.jpg'),
+        )
+
+    def test_transfer_of_non_ascii_name(self):
+        """Имена с кириллицей передаются фронтенд-серверу в кодировке URL"""
+        with self.settings(MEDIA_SENDFILE='x-accel-redirect'):
+            response = self.guest_client.get('/media/posts/картинка.jpg')
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            '/protected-media/posts/%D0%BA%D0%B0%D1%80%D1%82%D0%B8%D0%BD'
+            '%D0%BA%D0%B0.jpg',
+        )
+        with self.settings(MEDIA_SENDFILE='x-sendfile'):
+            response = self.guest_client.get('/media/posts/картинка.jpg')
+        self.assertTrue(response['X-Sendfile'].endswith(
+            '/posts/%D0%BA%D0%B0%D1%80%D1%82%D0%B8%D0%BD%D0%BA%D0%B0.jpg'
+        ))
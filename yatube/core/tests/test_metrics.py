@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+
+from core import metrics
+from posts.models import Follow, Post
+
+User = get_user_model()
+
+
+class MetricsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.author = User.objects.create_user(username='Author')
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_model_hooks(self):
+        """Посты, подписки и отписки попадают в счётчики"""
+        created = metrics.get_value('posts_created')
+        followed = metrics.get_value('follows', action='follow')
+        unfollowed = metrics.get_value('follows', action='unfollow')
+        Post.objects.create(author=self.author, text='Текст поста')
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        follow.delete()
+        self.assertEqual(metrics.get_value('posts_created'), created + 1)
+        self.assertEqual(
+            metrics.get_value('follows', action='follow'), followed + 1
+        )
+        self.assertEqual(
+            metrics.get_value('follows', action='unfollow'), unfollowed + 1
+        )
+
+    def test_cache_hits_and_misses(self):
+        """Попадания и промахи кеша считаются по префиксу ключа"""
+        Post.objects.create(author=self.author, text='Текст поста')
+        misses = metrics.get_value(
+            'cache_requests', prefix='author_card', result='miss'
+        )
+        hits = metrics.get_value(
+            'cache_requests', prefix='author_card', result='hit'
+        )
+        self.guest_client.get(f'/profile/{self.author.username}/')
+        self.guest_client.get(f'/profile/{self.author.username}/')
+        self.assertEqual(metrics.get_value(
+            'cache_requests', prefix='author_card', result='miss'
+        ), misses + 1)
+        self.assertEqual(metrics.get_value(
+            'cache_requests', prefix='author_card', result='hit'
+        ), hits + 1)
+
+    def test_endpoint(self):
+        """/metrics отдаёт счётчики и показатели в формате Prometheus"""
+        Post.objects.create(author=self.author, text='Текст поста')
+        response = self.guest_client.get('/metrics')
+        self.assertEqual(response['Content-Type'],
+                         'text/plain; version=0.0.4')
+        text = response.content.decode()
+        self.assertIn('# TYPE yatube_posts_created_total counter', text)
+        self.assertIn('# TYPE yatube_tasks_pending gauge', text)
+        self.assertIn('yatube_tasks_pending 1', text)
+
+    def test_endpoint_forbidden_for_other_addresses(self):
+        """/metrics недоступен с адресов не из METRICS_ALLOWED_IPS"""
+        response = self.guest_client.get('/metrics', REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 403)
+
+    def test_multiprocess_counters_summed(self):
+        """В режиме нескольких процессов счётчики файлов складываются"""
+        directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with open(os.path.join(directory, '1-1.json'), 'w') as output:
+            json.dump([['posts_created', {}, 1000]], output)
+        with override_settings(METRICS_MULTIPROCESS_DIR=directory):
+            Post.objects.create(author=self.author, text='Текст поста')
+            local = metrics.get_value('posts_created')
+            totals = metrics.collect_counters()
+        self.assertEqual(totals[('posts_created', ())], local + 1000)
+
+    def test_idle_process_flushes_counters(self):
+        """Счётчики записываются в файл и без новых событий"""
+        directory = tempfile.mkdtemp(dir=settings.BASE_DIR)
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        with override_settings(
+            METRICS_MULTIPROCESS_DIR=directory, METRICS_FLUSH_INTERVAL=0.05
+        ):
+            metrics.increment('idle_test')
+            deadline = time.monotonic() + 5
+            names = []
+            while not names and time.monotonic() < deadline:
+                time.sleep(0.05)
+                names = [
+                    name for name in os.listdir(directory)
+                    if name.endswith('.json')
+                ]
+        self.assertEqual(len(names), 1)
+        with open(os.path.join(directory, names[0])) as source:
+            self.assertIn(['idle_test', {}, 1], json.load(source))
+
+    def test_large_values_exported_exactly(self):
+        """Большие значения выводятся полностью, без экспоненты"""
+        self.assertEqual(metrics.format_value(1234567.0), '1234567')
+        self.assertEqual(metrics.format_value(0.25), '0.25')
+        self.assertEqual(metrics.format_value(12345678901), '12345678901')
+
+    def test_label_values_escaped(self):
+        """Значения меток экранируются"""
+        self.assertEqual(
+            metrics.format_labels((('prefix', 'a"b\\c\n'),)),
+            '{prefix="a\\"b\\\\c\\n"}',
+        )
@@ -0,0 +1,64 @@
+import gzip
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+
+from core.middleware import minify_html
+from posts.models import Post
+
+User = get_user_model()
+
+
+class CompressionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text='Текст поста') for _ in range(10)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_feed_compressed_with_gzip(self):
+        """Лента сжимается gzip, если клиент его принимает"""
+        response = self.guest_client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(
+            int(response['Content-Length']), len(response.content)
+        )
+        html = gzip.decompress(response.content).decode()
+        self.assertIn('Текст поста', html)
+
+    def test_feed_not_compressed_without_accept_encoding(self):
+        """Без Accept-Encoding ответ отдаётся как есть"""
+        response = self.guest_client.get('/')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertContains(response, 'Текст поста')
+
+    def test_cached_page_compressed_once(self):
+        """Сжатые байты закешированной страницы берутся из кеша"""
+        self.guest_client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        with mock.patch('core.middleware.compress') as compress:
+            response = self.guest_client.get(
+                '/', HTTP_ACCEPT_ENCODING='gzip'
+            )
+        compress.assert_not_called()
+        self.assertIn(
+            'Текст поста', gzip.decompress(response.content).decode()
+        )
+
+    def test_minify_html_keeps_textarea(self):
+        """Минификация схлопывает пробелы, но не трогает textarea"""
+        html = '<ul>\n    <li>a</li>\n</ul>\n<textarea>\n  x\n</textarea>'
+        self.assertEqual(
+            minify_html(html),
+            '<ul>\n<li>a</li>\n</ul>\n<textarea>\n  x\n</textarea>',
+        )
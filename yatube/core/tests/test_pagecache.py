@@ -0,0 +1,82 @@
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.pagecache import coalesced_cache_page
+
+
+class CountingView:
+    def __init__(self, delay=0):
+        self.calls = 0
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        with self.lock:
+            self.calls += 1
+            calls = self.calls
+        time.sleep(self.delay)
+        return HttpResponse(f'ответ {calls}')
+
+
+@override_settings(PAGE_CACHE_STALE=60, PAGE_CACHE_WAIT=2)
+class CoalescedCachePageTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        cache.clear()
+
+    def get(self, view):
+        return view(self.factory.get('/page/')).content.decode()
+
+    def test_fresh_page_served_from_cache(self):
+        """Пока страница свежая, view не вызывается"""
+        counter = CountingView()
+        view = coalesced_cache_page(20, key_prefix='test')(counter)
+        self.assertEqual(self.get(view), 'ответ 1')
+        self.assertEqual(self.get(view), 'ответ 1')
+        self.assertEqual(counter.calls, 1)
+
+    def test_stale_page_served_while_recomputed(self):
+        """Устаревшую страницу пересчитывает один запрос, остальные
+        получают прежний ответ"""
+        counter = CountingView()
+        view = coalesced_cache_page(20, key_prefix='test')(counter)
+        self.get(view)
+        later = time.time() + 30
+        with mock.patch('core.pagecache.time.time', return_value=later):
+            cache.add('pagecache-lock:test:http://testserver/page/', 1)
+            self.assertEqual(self.get(view), 'ответ 1')
+            cache.delete('pagecache-lock:test:http://testserver/page/')
+            self.assertEqual(self.get(view), 'ответ 2')
+            self.assertEqual(self.get(view), 'ответ 2')
+        self.assertEqual(counter.calls, 2)
+
+    def test_concurrent_misses_coalesced(self):
+        """Одновременные промахи вызывают view один раз"""
+        counter = CountingView(delay=0.3)
+        view = coalesced_cache_page(20, key_prefix='test')(counter)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.get(view)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(counter.calls, 1)
+        self.assertEqual(results, ['ответ 1'] * 5)
+
+    def test_post_not_cached(self):
+        """Запросы на запись не кешируются"""
+        counter = CountingView()
+        view = coalesced_cache_page(20, key_prefix='test')(counter)
+        view(self.factory.post('/page/'))
+        view(self.factory.post('/page/'))
+        self.assertEqual(counter.calls, 2)
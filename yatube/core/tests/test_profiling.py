@@ -0,0 +1,158 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from core.profiling import (
+    SAMPLING_CACHE_KEY, SamplingProfiler, get_logger, read_collapsed,
+    sampling_sessions
+)
+from posts.models import Post
+
+User = get_user_model()
+TEMP_LOG_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+LOG = os.path.join(TEMP_LOG_DIR, 'slow_sql.log')
+PROFILES = os.path.join(TEMP_LOG_DIR, 'profiles')
+
+
+@override_settings(
+    SQL_PROFILING=True, SQL_PROFILING_THRESHOLD_MS=0, SQL_PROFILING_LOG=LOG
+)
+class SQLProfilingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        Post.objects.create(author=cls.user, text='Текст поста')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_LOG_DIR, ignore_errors=True)
+
+    def tearDown(self):
+        cache.clear()
+        logger = get_logger()
+        for handler in list(logger.handlers):
+            handler.close()
+            logger.removeHandler(handler)
+        if os.path.exists(LOG):
+            os.remove(LOG)
+
+    def read_log(self):
+        with open(LOG, encoding='utf-8') as log:
+            return [json.loads(line) for line in log]
+
+    def test_view_queries_logged_with_plan(self):
+        """Запросы view записываются с планом и стеком вызова"""
+        Client().get('/')
+        samples = self.read_log()
+        self.assertTrue(samples)
+        self.assertEqual({sample['view'] for sample in samples},
+                         {'posts.views.index'})
+        select = next(
+            sample for sample in samples if 'posts_post' in sample['sql']
+        )
+        self.assertTrue(select['plan'])
+        self.assertTrue(any('posts/views.py' in frame
+                            for frame in select['stack']))
+
+    def test_other_views_not_logged(self):
+        """Запросы view вне SQL_PROFILING_VIEWS не записываются"""
+        Client().get('/about/author/')
+        self.assertFalse(os.path.exists(LOG))
+
+    def test_report(self):
+        """Сводка показывает самые затратные запросы"""
+        Client().get('/')
+        out = StringIO()
+        call_command('sql_profile_report', limit=1, stdout=out)
+        self.assertIn('posts.views.index', out.getvalue())
+        self.assertIn('план:', out.getvalue())
+
+
+def busy_view(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+@override_settings(SAMPLING_PROFILER_DIR=PROFILES)
+class SamplingProfilerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='Staff', is_staff=True)
+        cls.user = User.objects.create_user(username='SomeUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_LOG_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def tearDown(self):
+        cache.clear()
+        shutil.rmtree(PROFILES, ignore_errors=True)
+
+    def test_samples_tracked_threads(self):
+        """Снимаются стеки только отмеченных потоков"""
+        profiler = SamplingProfiler('test', time.time() + 0.2, 0.001)
+        stop = threading.Event()
+
+        def worker():
+            profiler.track('posts.views.index')
+            busy_view(stop)
+
+        thread = threading.Thread(target=worker)
+        thread.start()
+        profiler.start()
+        profiler.thread.join()
+        stop.set()
+        thread.join()
+        stacks = read_collapsed([profiler.path])
+        self.assertTrue(stacks)
+        for stack in stacks:
+            self.assertTrue(stack.startswith('posts.views.index;'))
+            self.assertIn('test_profiling.py:busy_view', stack)
+        self.assertEqual(list(sampling_sessions()), ['test'])
+
+    def test_toggle_requires_staff(self):
+        """Включить профилировщик может только сотрудник"""
+        client = Client()
+        client.force_login(self.user)
+        client.post('/admin/profiler/', {'seconds': 10})
+        self.assertIsNone(cache.get(SAMPLING_CACHE_KEY))
+        self.staff_client.post('/admin/profiler/', {'seconds': 10})
+        session, until = cache.get(SAMPLING_CACHE_KEY)
+        self.assertGreater(until, time.time())
+        self.staff_client.post('/admin/profiler/', {'stop': ''})
+        self.assertIsNone(cache.get(SAMPLING_CACHE_KEY))
+
+    def test_export_merges_processes(self):
+        """Выгрузка складывает стеки всех процессов сессии"""
+        os.makedirs(PROFILES)
+        for pid, count in ((1, 2), (2, 3)):
+            with open(os.path.join(PROFILES, f'20260101-000000-{pid}.folded'),
+                      'w') as output:
+                output.write(f'posts.views.index;a;b {count}\n')
+        response = self.staff_client.get(
+            '/admin/profiler/20260101-000000.folded'
+        )
+        self.assertEqual(
+            response.content.decode(), 'posts.views.index;a;b 5\n'
+        )
+        self.assertContains(
+            self.staff_client.get('/admin/profiler/'), '20260101-000000'
+        )
@@ -0,0 +1,63 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+
+@override_settings(RATELIMITS={
+    'posts:add_comment': {'ip': '100/m', 'user': '2/m'},
+    'users:signup': {'ip': '1/h'},
+})
+class RateLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.post = Post.objects.create(author=cls.user, text='Текст поста')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_user_bucket_rejects_extra_comments(self):
+        """Комментарии сверх лимита пользователя отклоняются"""
+        url = reverse('posts:add_comment', args=[self.post.id])
+        rejected = metrics.get_value(
+            'ratelimit_decisions', view='posts:add_comment', result='rejected'
+        )
+        for _ in range(2):
+            response = self.authorized_client.post(url, {'text': 'Текст'})
+            self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        response = self.authorized_client.post(url, {'text': 'Текст'})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(metrics.get_value(
+            'ratelimit_decisions', view='posts:add_comment', result='rejected'
+        ), rejected + 1)
+
+    def test_ip_bucket_rejects_without_db_queries(self):
+        """Лимит по адресу срабатывает без запросов к базе"""
+        url = reverse('users:signup')
+        self.guest_client.post(url, {})
+        with self.assertNumQueries(0):
+            response = self.guest_client.post(url, {})
+        self.assertEqual(response.status_code, HTTPStatus.TOO_MANY_REQUESTS)
+
+    def test_safe_methods_not_limited(self):
+        """GET-запросы не расходуют жетоны"""
+        for _ in range(3):
+            response = self.guest_client.get(reverse('users:signup'))
+            self.assertEqual(response.status_code, HTTPStatus.OK)
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+User = get_user_model()
+TEMP_CACHE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': TEMP_CACHE_DIR,
+    }
+}
+
+
+class SessionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+
+    def tearDown(self):
+        cache.clear()
+
+    def count_queries(self):
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:follow_index'))
+        with CaptureQueriesContext(connection) as queries:
+            client.get(reverse('posts:follow_index'))
+        return [query['sql'] for query in queries]
+
+    def test_cached_session_skips_session_table(self):
+        """С общим кешем сессия не читается из django_session"""
+        with override_settings(
+            SESSION_ENGINE='django.contrib.sessions.backends.db'
+        ):
+            db_queries = self.count_queries()
+        with override_settings(CACHES=SHARED_CACHES):
+            cached_queries = self.count_queries()
+        self.assertTrue(any('django_session' in sql for sql in db_queries))
+        self.assertFalse(
+            any('django_session' in sql for sql in cached_queries)
+        )
+        self.assertLess(len(cached_queries), len(db_queries))
+
+    def test_session_read_from_db_without_shared_cache(self):
+        """С кешем процесса удалённая в базе сессия недействительна"""
+        client = Client()
+        client.force_login(self.user)
+        self.assertTrue(any(
+            'django_session' in sql for sql in self.count_queries()
+        ))
+        Session.objects.all().delete()
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_purge_sessions_in_batches(self):
+        """Команда удаляет только истёкшие сессии"""
+        expired = timezone.now() - timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f'expired{i}', session_data='',
+                    expire_date=expired)
+            for i in range(5)
+        )
+        Session.objects.create(
+            session_key='active', session_data='',
+            expire_date=timezone.now() + timedelta(days=1),
+        )
+        call_command('purge_sessions', batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            list(Session.objects.values_list('session_key', flat=True)),
+            ['active'],
+        )
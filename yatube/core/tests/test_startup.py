@@ -0,0 +1,34 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core.startup import parse_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     xml.parsers
+import time:       300 |        420 |   xml.etree
+import time:       200 |        620 | posts.views
+"""
+
+
+class StartupTests(SimpleTestCase):
+    def test_parse_importtime(self):
+        """Разбор вывода -X importtime пропускает заголовок"""
+        modules = parse_importtime(IMPORTTIME)
+        self.assertEqual(
+            [(module['name'], module['self'], module['cumulative'])
+             for module in modules],
+            [('xml.parsers', 120, 120), ('xml.etree', 300, 420),
+             ('posts.views', 200, 620)],
+        )
+
+    def test_import_time_report(self):
+        """Отчёт об импортах показывает модули проекта"""
+        out = StringIO()
+        call_command(
+            'import_time_report', scenario='setup', prefix=['posts'],
+            stdout=out,
+        )
+        self.assertIn('posts.signals', out.getvalue())
@@ -0,0 +1,103 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.wsgi import StaticFilesApplication
+
+TEMP_STATIC_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SOURCE_DIR = os.path.join(TEMP_STATIC_DIR, 'source')
+STATIC_ROOT = os.path.join(TEMP_STATIC_DIR, 'collected')
+CSS = b'body { color: red; }\n' * 50
+
+
+def django_application(environ, start_response):
+    start_response('200 OK', [])
+    return [b'django']
+
+
+@override_settings(
+    STATICFILES_DIRS=(SOURCE_DIR,),
+    STATIC_ROOT=STATIC_ROOT,
+    STATICFILES_STORAGE='core.storage.CompressedManifestStaticFilesStorage',
+)
+class StaticFilesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(SOURCE_DIR, 'css'))
+        with open(os.path.join(SOURCE_DIR, 'css', 'site.css'), 'wb') as file:
+            file.write(CSS)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_STATIC_DIR, ignore_errors=True)
+
+    def get(self, path, **environ):
+        response = {}
+
+        def start_response(status, headers):
+            response['status'] = status
+            response['headers'] = dict(headers)
+
+        environ.setdefault('REQUEST_METHOD', 'GET')
+        environ['PATH_INFO'] = path
+        application = StaticFilesApplication(django_application)
+        response['body'] = b''.join(application(environ, start_response))
+        return response
+
+    def hashed_name(self):
+        names = os.listdir(os.path.join(STATIC_ROOT, 'css'))
+        return [name for name in names if name.endswith('.css')
+                and name != 'site.css'][0]
+
+    def test_collectstatic_writes_compressed_copies(self):
+        """collectstatic сохраняет gzip-копии исходного и хешированного
+        файлов"""
+        for name in ('site.css', self.hashed_name()):
+            with self.subTest(name=name):
+                path = os.path.join(STATIC_ROOT, 'css', name + '.gz')
+                with open(path, 'rb') as file:
+                    self.assertEqual(gzip.decompress(file.read()), CSS)
+
+    def test_hashed_file_served_compressed_and_immutable(self):
+        """Хешированный файл отдаётся сжатым и кешируется навсегда"""
+        response = self.get(
+            '/static/css/' + self.hashed_name(),
+            HTTP_ACCEPT_ENCODING='gzip',
+        )
+        self.assertEqual(response['status'], '200 OK')
+        self.assertEqual(response['headers']['Content-Encoding'], 'gzip')
+        self.assertIn('immutable', response['headers']['Cache-Control'])
+        self.assertEqual(gzip.decompress(response['body']), CSS)
+
+    def test_unhashed_file_served_with_short_cache(self):
+        """Файл без хеша отдаётся без сжатия и с коротким кешем"""
+        response = self.get('/static/css/site.css')
+        self.assertEqual(response['body'], CSS)
+        self.assertNotIn('Content-Encoding', response['headers'])
+        self.assertNotIn('immutable', response['headers']['Cache-Control'])
+
+    def test_missing_file_and_other_urls(self):
+        """Статика не доходит до Django, остальные адреса — доходят"""
+        self.assertEqual(
+            self.get('/static/../settings.py')['status'], '404 Not Found'
+        )
+        self.assertEqual(self.get('/posts/1/')['body'], b'django')
+
+    def test_missing_files_not_remembered(self):
+        """Таблица строится при запуске и не растёт от запросов
+        несуществующих файлов"""
+        application = StaticFilesApplication(django_application)
+        names = set(application.files)
+        self.assertIn('css/site.css', names)
+        self.assertNotIn('css/site.css.gz', names)
+        for number in range(10):
+            self.assertIsNone(application.find(f'css/missing-{number}.css'))
+        self.assertEqual(set(application.files), names)
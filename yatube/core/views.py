@@ -1,4 +1,25 @@
-from django.shortcuts import render
+import mimetypes
+import os
+from http import HTTPStatus
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.cache import cache
+from django.http import FileResponse, Http404, HttpResponse
+from django.shortcuts import redirect, render
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_safe
+
+from . import metrics as registry
+from .forms import SamplingProfilerForm
+from .media import (
+    RangeFile, file_etag, find_media, last_modified, parse_range
+)
+from .profiling import (
+    SAMPLING_CACHE_KEY, read_collapsed, sampling_sessions, start_sampling,
+    stop_sampling
+)
 
 
 def page_not_found(request, exception):
@@ -15,3 +36,127 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@require_safe
+def media(request, path):
+    """Файлы из MEDIA_ROOT.
+
+    После проверки доступа передача отдаётся фронтенд-серверу
+    заголовком X-Sendfile или X-Accel-Redirect (MEDIA_SENDFILE), а он
+    сам обрабатывает Range. Без фронтенд-сервера файл отдаёт
+    FileResponse с поддержкой одного диапазона Range.
+    """
+    found = find_media(path)
+    if found is None:
+        raise Http404
+    name, full_path = found
+    stat = os.stat(full_path)
+    etag = file_etag(stat)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': last_modified(stat),
+        'Cache-Control': f'public, max-age={settings.MEDIA_MAX_AGE}',
+        'Accept-Ranges': 'bytes',
+    }
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    if etag in (quote_etag(tag.strip()) for tag in if_none_match.split(',')):
+        return with_headers(HttpResponse(status=HTTPStatus.NOT_MODIFIED), {
+            'ETag': etag, 'Cache-Control': headers['Cache-Control'],
+        })
+    content_type, _ = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+    if settings.MEDIA_SENDFILE == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        # Заголовки передаются в latin-1, поэтому имена с кириллицей
+        # кодируются в URL; nginx раскодирует их сам.
+        response['X-Accel-Redirect'] = (
+            settings.MEDIA_ACCEL_PREFIX + quote(name)
+        )
+        return with_headers(response, headers)
+    if settings.MEDIA_SENDFILE == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        # mod_xsendfile и lighttpd раскодируют %XX в пути к файлу.
+        response['X-Sendfile'] = quote(os.fsencode(full_path))
+        return with_headers(response, headers)
+    byte_range = None
+    if request.META.get('HTTP_IF_RANGE', etag) == etag:
+        try:
+            byte_range = parse_range(
+                request.META.get('HTTP_RANGE'), stat.st_size
+            )
+        except ValueError:
+            response = HttpResponse(
+                status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+            )
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            RangeFile(file, start, end),
+            status=HTTPStatus.PARTIAL_CONTENT,
+            content_type=content_type,
+        )
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return with_headers(response, headers)
+
+
+def metrics(request):
+    """Счётчики приложения для Prometheus.
+
+    Доступны только с адресов METRICS_ALLOWED_IPS.
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponse(status=HTTPStatus.FORBIDDEN)
+    return HttpResponse(
+        registry.render(), content_type='text/plain; version=0.0.4'
+    )
+
+
+def with_headers(response, headers):
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+@staff_member_required
+def sampling_profiler(request):
+    """Включение профилировщика в рабочих процессах и список сессий."""
+    form = SamplingProfilerForm(request.POST or None)
+    if request.method == 'POST':
+        if 'stop' in request.POST:
+            stop_sampling()
+            return redirect('sampling_profiler')
+        if form.is_valid():
+            start_sampling(form.cleaned_data['seconds'])
+            return redirect('sampling_profiler')
+    return render(request, 'core/sampling_profiler.html', {
+        'form': form,
+        'active': cache.get(SAMPLING_CACHE_KEY),
+        'sessions': sorted(
+            sampling_sessions().items(), reverse=True
+        ),
+    })
+
+
+@staff_member_required
+def sampling_profile(request, session):
+    """Свёрнутые стеки сессии, сложенные по всем процессам.
+
+    Файл открывается flamegraph.pl, speedscope и аналогами.
+    """
+    paths = sampling_sessions().get(session)
+    if paths is None:
+        raise Http404
+    response = HttpResponse(content_type='text/plain; charset=utf-8')
+    response['Content-Disposition'] = (
+        f'attachment; filename="{session}.folded"'
+    )
+    for stack, count in read_collapsed(paths).most_common():
+        response.write(f'{stack} {count}\n')
+    return response
@@ -0,0 +1,153 @@
+import json
+import mimetypes
+import os
+from email.utils import formatdate
+
+from django.conf import settings
+
+from .compression import choose_encoding
+from .storage import ENCODING_SUFFIXES
+
+MANIFEST_NAME = 'staticfiles.json'
+BLOCK_SIZE = 64 * 1024
+
+
+class StaticFile:
+    """Описание файла статики и его сжатых вариантов."""
+
+    def __init__(self, path, content_type, immutable):
+        self.content_type = content_type
+        self.immutable = immutable
+        self.variants = {}
+        for encoding, suffix in ENCODING_SUFFIXES.items():
+            if os.path.isfile(path + suffix):
+                self.variants[encoding] = self.describe(path + suffix)
+        self.variants[None] = self.describe(path)
+
+    @staticmethod
+    def describe(path):
+        stat = os.stat(path)
+        return {
+            'path': path,
+            'size': stat.st_size,
+            'etag': '"{:x}-{:x}"'.format(int(stat.st_mtime), stat.st_size),
+            'last_modified': formatdate(stat.st_mtime, usegmt=True),
+        }
+
+
+class StaticFilesApplication:
+    """WSGI-обёртка, отдающая собранную статику в обход Django.
+
+    Файлы из ``STATIC_ROOT`` отдаются с учётом ``Accept-Encoding``
+    (заранее сжатые ``.br``/``.gz`` копии), а файлы с хешем в имени из
+    манифеста — с заголовком ``Cache-Control: immutable`` на год.
+
+    Таблица файлов строится один раз при запуске, поэтому после
+    collectstatic процесс нужно перезапустить.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = os.path.realpath(root or settings.STATIC_ROOT or '')
+        self.prefix = prefix or settings.STATIC_URL
+        self.enabled = bool(self.root) and os.path.isdir(self.root)
+        self.hashed_names = (
+            self.load_hashed_names() if self.enabled else set()
+        )
+        self.files = self.load_files() if self.enabled else {}
+
+    def load_hashed_names(self):
+        try:
+            with open(os.path.join(self.root, MANIFEST_NAME)) as manifest:
+                return set(json.load(manifest).get('paths', {}).values())
+        except (OSError, ValueError):
+            return set()
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not self.enabled or not path.startswith(self.prefix):
+            return self.application(environ, start_response)
+        if environ['REQUEST_METHOD'] not in ('GET', 'HEAD'):
+            return self.respond(start_response, '405 Method Not Allowed', [
+                ('Allow', 'GET, HEAD'),
+            ])
+        static_file = self.find(path[len(self.prefix):])
+        if static_file is None:
+            return self.respond(start_response, '404 Not Found')
+        return self.serve(static_file, environ, start_response)
+
+    def load_files(self):
+        """Все файлы STATIC_ROOT по имени; сжатые копии описываются
+        вместе с исходным файлом."""
+        suffixes = tuple(ENCODING_SUFFIXES.values())
+        files = {}
+        for directory, _, names in os.walk(self.root):
+            for filename in names:
+                path = os.path.join(directory, filename)
+                if path.endswith(suffixes) and os.path.isfile(
+                    os.path.splitext(path)[0]
+                ):
+                    continue
+                name = os.path.relpath(path, self.root).replace(os.sep, '/')
+                content_type, _ = mimetypes.guess_type(path)
+                files[name] = StaticFile(
+                    path,
+                    content_type or 'application/octet-stream',
+                    name in self.hashed_names,
+                )
+        return files
+
+    def find(self, name):
+        return self.files.get(name)
+
+    def serve(self, static_file, environ, start_response):
+        encoding = choose_encoding(
+            environ.get('HTTP_ACCEPT_ENCODING', ''),
+            [key for key in static_file.variants if key],
+        )
+        variant = static_file.variants[encoding]
+        headers = [
+            ('Cache-Control', self.cache_control(static_file)),
+            ('ETag', variant['etag']),
+            ('Last-Modified', variant['last_modified']),
+        ]
+        if len(static_file.variants) > 1:
+            headers.append(('Vary', 'Accept-Encoding'))
+        if environ.get('HTTP_IF_NONE_MATCH') == variant['etag']:
+            return self.respond(start_response, '304 Not Modified', headers)
+        headers += [
+            ('Content-Type', static_file.content_type),
+            ('Content-Length', str(variant['size'])),
+        ]
+        if encoding:
+            headers.append(('Content-Encoding', encoding))
+        start_response('200 OK', headers)
+        if environ['REQUEST_METHOD'] == 'HEAD':
+            return []
+        file = open(variant['path'], 'rb')
+        file_wrapper = environ.get('wsgi.file_wrapper')
+        if file_wrapper is not None:
+            return file_wrapper(file, BLOCK_SIZE)
+        return read_blocks(file)
+
+    @staticmethod
+    def cache_control(static_file):
+        if static_file.immutable:
+            return 'public, max-age={}, immutable'.format(
+                settings.STATIC_IMMUTABLE_MAX_AGE
+            )
+        return 'public, max-age={}'.format(settings.STATIC_MAX_AGE)
+
+    @staticmethod
+    def respond(start_response, status, headers=()):
+        headers = list(headers)
+        if not status.startswith('304'):
+            headers.append(('Content-Length', '0'))
+        start_response(status, headers)
+        return []
+
+
+def read_blocks(file):
+    with file:
+        for block in iter(lambda: file.read(BLOCK_SIZE), b''):
+            yield block
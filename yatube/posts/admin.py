@@ -1,14 +1,55 @@
 from django.contrib import admin
-from .models import Post, Group
 
+from core.admin import LargeTableAdmin
+from .models import ArchivedPost, Comment, Follow, Group, Post
 
-class PostAdmin(admin.ModelAdmin):
+
+class PostAdmin(LargeTableAdmin):
     list_editable = ('group',)
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_select_related = ('author', 'group')
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('group',)
+    search_fields = ('text',)
+    list_filter = ('pub_date',)
+    empty_value_display = '-пусто-'
+    cursor_field = 'pub_date'
+
+
+class ArchivedPostAdmin(LargeTableAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_select_related = ('author', 'group')
+    raw_id_fields = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    cursor_field = 'pub_date'
+
+
+class GroupAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'title', 'slug')
+    search_fields = ('title', 'slug')
+
+
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
+    raw_id_fields = ('author', 'post')
+    search_fields = ('text',)
+    list_filter = ('created',)
+    empty_value_display = '-пусто-'
+    cursor_field = 'created'
+
+
+class FollowAdmin(LargeTableAdmin):
+    list_display = ('pk', 'user', 'author')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
+    search_fields = ('user__username', 'author__username')
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(ArchivedPost, ArchivedPostAdmin)
+admin.site.register(Group, GroupAdmin)
+admin.site.register(Comment, CommentAdmin)
+admin.site.register(Follow, FollowAdmin)
@@ -0,0 +1,108 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core import edge
+from . import stats
+from .models import (
+    ArchivedComment, ArchivedPost, Comment, Group, Notification, Post,
+    PostRank, User
+)
+
+POST_COLUMNS = (
+    'id', 'text', 'pub_date', 'author_id', 'group_id', 'image',
+    'image_variants',
+)
+COMMENT_COLUMNS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def raw_delete(queryset):
+    return queryset._raw_delete(queryset.db)
+
+
+def purge_archived_pages(rows):
+    """Очищает кеш прокси для лент, из которых ушли посты."""
+    if not edge.purge_enabled():
+        return
+    usernames = User.objects.filter(
+        id__in={row['author_id'] for row in rows}
+    ).values_list('username', flat=True)
+    slugs = Group.objects.filter(
+        id__in={row['group_id'] for row in rows}
+    ).values_list('slug', flat=True)
+    edge.purge(
+        'posts', 'groups',
+        *(f'profile-{username}' for username in usernames),
+        *(f'group-{slug}' for slug in slugs),
+    )
+
+
+def archive_batch(post_ids):
+    """Переносит посты с комментариями в архив в одной транзакции.
+
+    Строки удаляются без сигналов: статистика групп обновляется одним
+    запросом на группу, а не на каждый пост и комментарий.
+    """
+    with transaction.atomic():
+        rows = list(
+            Post.objects.filter(id__in=post_ids).order_by()
+            .values(*POST_COLUMNS)
+        )
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**row) for row in rows
+        )
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(**row) for row in Comment.objects.filter(
+                post_id__in=post_ids
+            ).order_by().values(*COMMENT_COLUMNS)
+        )
+        raw_delete(Comment.objects.filter(post_id__in=post_ids))
+        raw_delete(Notification.objects.filter(post_id__in=post_ids))
+        raw_delete(PostRank.objects.filter(post_id__in=post_ids))
+        raw_delete(Post.objects.filter(id__in=post_ids))
+        group_counts = Counter(
+            row['group_id'] for row in rows if row['group_id'] is not None
+        )
+        for group_id, count in group_counts.items():
+            stats.post_removed(group_id, count)
+    purge_archived_pages(rows)
+
+
+def archive_posts(days=None, batch_size=500):
+    """Переносит в архив посты старше ``days`` дней
+    (по умолчанию ``POSTS_ARCHIVE_AFTER_DAYS``).
+
+    Работает пачками по ``batch_size`` постов, чтобы не держать долгих
+    блокировок. Возвращает количество перенесённых постов.
+    """
+    if days is None:
+        days = settings.POSTS_ARCHIVE_AFTER_DAYS
+    before = timezone.now() - timedelta(days=days)
+    archived = 0
+    while True:
+        post_ids = list(
+            Post.objects.filter(pub_date__lt=before)
+            .order_by('pub_date')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if not post_ids:
+            return archived
+        archive_batch(post_ids)
+        archived += len(post_ids)
+
+
+def get_post(post_id):
+    """Пост из горячей таблицы, а если его там нет — из архива.
+
+    Возвращает None, если поста нет ни там, ни там.
+    """
+    for model in (Post, ArchivedPost):
+        post = model.objects.select_related('author', 'group').filter(
+            id=post_id
+        ).first()
+        if post is not None:
+            return post
+    return None
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.db import transaction
+from sorl.thumbnail import delete as delete_image_and_thumbnails
+
+from core.tasks import enqueue
+from .models import ArchivedPost, Comment, Notification, Post
+
+
+def delete_in_chunks(queryset, batch_size, raw=False):
+    """Удаляет строки выборки пачками, каждую в своей транзакции.
+
+    ``raw`` удаляет без сигналов и загрузки объектов; годится, когда
+    обработчики сигналов ничего не меняют для удаляемого целиком поста.
+    """
+    deleted = 0
+    while True:
+        ids = list(queryset.order_by().values_list('id', flat=True)[
+            :batch_size
+        ])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            chunk = queryset.model.objects.filter(id__in=ids)
+            if raw:
+                deleted += chunk._raw_delete(chunk.db)
+            else:
+                deleted += chunk.delete()[0]
+
+
+def delete_post(post, batch_size=None):
+    """Удаляет пост, не блокируя базу одной большой транзакцией.
+
+    Комментарии и уведомления удаляются пачками по ``batch_size``
+    (по умолчанию ``POST_DELETE_BATCH_SIZE``). Статистику группы и
+    кеш прокси обновляют сигналы поста. Счётчики непрочитанного у
+    подписчиков сбрасывает задача posts.reset_followers_unread, а
+    картинку с миниатюрами удаляет задача posts.delete_media.
+    """
+    batch_size = batch_size or settings.POST_DELETE_BATCH_SIZE
+    delete_in_chunks(
+        Comment.objects.filter(post=post), batch_size, raw=True
+    )
+    delete_in_chunks(Notification.objects.filter(post=post), batch_size)
+    with transaction.atomic():
+        image = post.image.name
+        post.delete()
+        if image:
+            enqueue('posts.delete_media', path=image)
+        enqueue('posts.reset_followers_unread', author_id=post.author_id)
+
+
+def delete_media(path):
+    """Удаляет файл и миниатюры, если на файл больше не ссылаются посты."""
+    referenced = (
+        Post.objects.filter(image=path).exists()
+        or ArchivedPost.objects.filter(image=path).exists()
+    )
+    if not referenced:
+        delete_image_and_thumbnails(path)
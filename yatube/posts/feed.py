@@ -0,0 +1,99 @@
+from itertools import islice
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from core import caching, metrics
+from .models import FeedVisit, Follow, Post
+
+UNREAD_CACHE_TIMEOUT = 24 * 60 * 60
+# С кешем процесса раздача постов в него не попадает, поэтому
+# счётчик живёт недолго и затем пересчитывается по базе.
+UNREAD_LOCAL_CACHE_TIMEOUT = 60
+RESET_BATCH_SIZE = 500
+
+
+def unread_key(user_id):
+    return f'feed_unread:{user_id}'
+
+
+def count_unread(user):
+    posts = Post.objects.filter(author_id__in=Follow.objects.filter(
+        user=user
+    ).values('author_id'))
+    last_seen = FeedVisit.objects.filter(user=user).values_list(
+        'last_seen', flat=True
+    ).first()
+    if last_seen is not None:
+        posts = posts.filter(pub_date__gt=last_seen)
+    return posts.count()
+
+
+def unread_timeout():
+    if caching.is_shared():
+        return UNREAD_CACHE_TIMEOUT
+    return UNREAD_LOCAL_CACHE_TIMEOUT
+
+
+def get_unread_count(user):
+    """Количество новых постов в ленте подписок.
+
+    Обычно это чтение счётчика из кеша; подсчёт по базе выполняется,
+    только если счётчика в кеше нет. Счётчик увеличивает раздача постов
+    в процессе фоновых задач. Кеш, который у каждого процесса свой,
+    этих изменений не видит, и в нём счётчик хранится не дольше
+    UNREAD_LOCAL_CACHE_TIMEOUT секунд.
+    """
+    key = unread_key(user.pk)
+    count = cache.get(key)
+    metrics.cache_lookup(
+        'feed_unread', hits=count is not None, misses=count is None
+    )
+    if count is None:
+        count = count_unread(user)
+        cache.set(key, count, unread_timeout())
+    return count
+
+
+def mark_feed_seen(user):
+    """Отмечает ленту просмотренной, возвращает прошлое время просмотра."""
+    now = timezone.now()
+    visit, created = FeedVisit.objects.get_or_create(
+        user=user, defaults={'last_seen': now}
+    )
+    last_seen = None if created else visit.last_seen
+    if not created:
+        FeedVisit.objects.filter(user=user).update(last_seen=now)
+    cache.set(unread_key(user.pk), 0, unread_timeout())
+    return last_seen
+
+
+def add_unread(user_ids):
+    """Увеличивает счётчики подписчиков, которые уже есть в кеше.
+
+    Отсутствующие счётчики не создаются: их посчитает get_unread_count.
+    """
+    for user_id in user_ids:
+        try:
+            cache.incr(unread_key(user_id))
+        except ValueError:
+            pass
+
+
+def reset_unread(user_id):
+    cache.delete(unread_key(user_id))
+
+
+def reset_followers_unread(author_id, batch_size=RESET_BATCH_SIZE):
+    """Сбрасывает счётчики всех подписчиков автора, по одному запросу
+    к кешу на пачку из ``batch_size`` подписчиков."""
+    follower_ids = Follow.objects.filter(author_id=author_id).values_list(
+        'user_id', flat=True
+    ).iterator()
+    while True:
+        keys = [unread_key(user_id) for user_id in islice(
+            follower_ids, batch_size
+        )]
+        if not keys:
+            return
+        cache.delete_many(keys)
@@ -1,5 +1,5 @@
 from django import forms
-from .models import Post, Comment
+from .models import Post, Comment, NotificationSettings
 
 
 class PostForm(forms.ModelForm):
@@ -25,3 +25,12 @@ class CommentForm(forms.ModelForm):
         help_texts = {
             'text': 'Напишите свой комментарий'
         }
+
+
+class NotificationSettingsForm(forms.ModelForm):
+    class Meta:
+        model = NotificationSettings
+        fields = ('inbox', 'email_digest')
+        help_texts = {
+            'email_digest': 'Не чаще одного письма в сутки'
+        }
@@ -0,0 +1,87 @@
+import json
+
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+from sorl.thumbnail.base import ThumbnailBackend
+
+from core import metrics
+from .models import ArchivedPost, Post
+
+MIME_TYPES = {'WEBP': 'image/webp', 'JPEG': 'image/jpeg'}
+
+
+class CountingThumbnailBackend(ThumbnailBackend):
+    """Бэкенд sorl.thumbnail, который считает созданные миниатюры."""
+
+    def _create_thumbnail(self, source_image, geometry_string, options,
+                          thumbnail):
+        super()._create_thumbnail(
+            source_image, geometry_string, options, thumbnail
+        )
+        metrics.increment('thumbnail_renders', format=options['format'])
+
+
+def geometry(layout, width):
+    ratio_width, ratio_height = settings.IMAGE_VARIANTS[layout]['ratio']
+    return f'{width}x{round(width * ratio_height / ratio_width)}'
+
+
+def get_variants(image, layout, image_format):
+    """Миниатюры картинки для вёрстки ``layout`` во всех ширинах."""
+    return [
+        (get_thumbnail(
+            image, geometry(layout, width),
+            crop='center', upscale=True, format=image_format,
+        ), width)
+        for width in settings.IMAGE_VARIANTS[layout]['widths']
+    ]
+
+
+def describe_variants(image, layout):
+    """Наборы srcset по форматам и запасная картинка для ``<img>``.
+
+    Браузер сам выбирает ширину по ``sizes`` и плотности экрана, поэтому
+    телефон загружает узкий вариант вместо картинки для компьютера.
+    Если картинку не удалось обработать, возвращает None.
+    """
+    sources = []
+    for image_format in settings.IMAGE_VARIANT_FORMATS:
+        variants = get_variants(image, layout, image_format)
+        largest = variants[-1][0]
+        if largest.size is None:
+            return None
+        sources.append({
+            'type': MIME_TYPES.get(image_format, ''),
+            'srcset': ', '.join(
+                f'{thumbnail.url} {width}w' for thumbnail, width in variants
+            ),
+            'image': {
+                'url': largest.url,
+                'width': largest.width,
+                'height': largest.height,
+            },
+        })
+    fallback = sources.pop()
+    return {
+        'sources': [
+            {'type': source['type'], 'srcset': source['srcset']}
+            for source in sources
+        ],
+        'srcset': fallback['srcset'],
+        'image': fallback['image'],
+    }
+
+
+def generate_variants(image):
+    """Создаёт варианты картинки для всех вёрсток и форматов и
+    сохраняет их описание в постах с этой картинкой, в том числе
+    архивных."""
+    layouts = {}
+    for layout in settings.IMAGE_VARIANTS:
+        description = describe_variants(image, layout)
+        if description is not None:
+            layouts[layout] = description
+    for model in (Post, ArchivedPost):
+        model.objects.filter(image=image).update(
+            image_variants=json.dumps(layouts)
+        )
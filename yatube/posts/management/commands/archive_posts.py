@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит старые посты с комментариями в архивные таблицы, '
+        'чтобы ленты работали только со свежими записями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=None,
+            help='Возраст поста в днях; по умолчанию '
+                 'POSTS_ARCHIVE_AFTER_DAYS.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Количество постов, переносимых в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        count = archive_posts(options['days'], options['batch_size'])
+        self.stdout.write(f'Перенесено в архив постов: {count}')
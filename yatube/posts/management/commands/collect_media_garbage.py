@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from posts.media import MediaCollector
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из MEDIA_ROOT картинки, на которые не ссылаются посты, '
+        'и миниатюры sorl.thumbnail без исходных картинок.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только подсчитать, ничего не удаляя.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Количество файлов, сверяемых с базой одним запросом.',
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0,
+            help='Пауза в секундах после каждой пачки удалений.',
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='Не трогать файлы моложе этого числа секунд.',
+        )
+
+    def handle(self, *args, **options):
+        collector = MediaCollector(
+            batch_size=options['batch_size'],
+            dry_run=options['dry_run'],
+            pause=options['pause'],
+            min_age=options['min_age'],
+        ).collect()
+        action = 'Будет удалено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(
+            f'{action} файлов: {collector.files} '
+            f'({filesizeformat(collector.bytes)}, {collector.bytes} байт), '
+            f'картинок в хранилище миниатюр: {collector.sources}'
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import generate_variants
+from posts.models import ArchivedPost, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт варианты картинок постов для srcset (IMAGE_VARIANTS) '
+        'для уже загруженных картинок.'
+    )
+
+    def handle(self, *args, **options):
+        images = Post.objects.exclude(image='').order_by().values_list(
+            'image', flat=True
+        ).union(
+            ArchivedPost.objects.exclude(image='').order_by().values_list(
+                'image', flat=True
+            )
+        )
+        count = 0
+        for image in images.iterator():
+            generate_variants(image)
+            count += 1
+        self.stdout.write(f'Обработано картинок: {count}')
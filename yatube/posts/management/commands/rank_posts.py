@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.ranking import rank_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает рейтинги постов для ленты популярного. '
+        'Нужен после развёртывания и для исправления расхождений счётчиков.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Количество постов, обрабатываемых за один проход.',
+        )
+
+    def handle(self, *args, **options):
+        count = rank_posts(batch_size=options['batch_size'])
+        self.stdout.write(f'Пересчитаны рейтинги постов: {count}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import refresh_group_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает статистику групп для каталога /groups/. '
+        'Запускается периодически, например из cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Количество записей в одном запросе на запись.',
+        )
+
+    def handle(self, *args, **options):
+        count = refresh_group_stats(batch_size=options['batch_size'])
+        self.stdout.write(f'Обновлена статистика групп: {count}')
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.notifications import send_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет подписчикам сводки о новых постах, не чаще одной '
+        'за NOTIFICATION_DIGEST_INTERVAL. Запускается периодически.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Количество подписчиков, обрабатываемых за раз.',
+        )
+
+    def handle(self, *args, **options):
+        count = send_digests(options['chunk_size'])
+        self.stdout.write(f'Отправлено сводок: {count}')
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import caching
+from posts.warmup import warm_caches
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет кеши после развёртывания: создаёт миниатюры и '
+        'отрисовывает ленты, самые большие группы, самых активных '
+        'авторов и популярные посты. С кешем, который у каждого '
+        'процесса свой (LocMemCache), страницы не отрисовываются: '
+        'их прогревает только WARM_CACHES_ON_STARTUP в процессах WSGI.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Сколько групп, авторов и постов прогревать; по '
+                 'умолчанию WARM_CACHES_LIMIT.',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=None,
+            help='Число потоков; по умолчанию WARM_CACHES_CONCURRENCY.',
+        )
+        parser.add_argument(
+            '--skip-images', action='store_true',
+            help='Не создавать миниатюры заранее.',
+        )
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        render = caching.is_shared()
+        if not render:
+            self.stderr.write(self.style.WARNING(
+                'Кеш у каждого процесса свой: страницы, отрисованные '
+                'командой, не увидит сервер. Страницы не прогреваются, '
+                'для них включите WARM_CACHES_ON_STARTUP.'
+            ))
+        result = warm_caches(
+            options['limit'],
+            options['concurrency'],
+            images=not options['skip_images'],
+            render=render,
+        )
+        self.stdout.write(
+            f'Страниц: {result["pages"]}, картинок: {result["images"]}, '
+            f'ошибок: {result["errors"]}, '
+            f'{time.monotonic() - start:.1f} с'
+        )
@@ -0,0 +1,143 @@
+import os
+import time
+from itertools import islice
+
+from django.conf import settings
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from .models import ArchivedPost, Post
+
+UPLOAD_DIR = Post._meta.get_field('image').upload_to
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def walk_files(directory):
+    """Файлы каталога в MEDIA_ROOT: имя относительно MEDIA_ROOT и stat.
+
+    Каталог обходится через os.scandir без сборки полного списка.
+    """
+    root = os.path.join(settings.MEDIA_ROOT, directory)
+    if not os.path.isdir(root):
+        return
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    name = os.path.relpath(entry.path, settings.MEDIA_ROOT)
+                    yield name.replace(os.sep, '/'), entry.stat()
+
+
+def referenced_images(names):
+    """Имена из ``names``, на которые ссылаются посты или архив."""
+    names = list(names)
+    referenced = set()
+    for model in (Post, ArchivedPost):
+        referenced.update(
+            model.objects.filter(image__in=names)
+            .values_list('image', flat=True)
+        )
+    return referenced
+
+
+class MediaCollector:
+    """Удаляет картинки без постов и миниатюры sorl.thumbnail без
+    исходных картинок.
+
+    Хранилище ключей миниатюр и каталоги MEDIA_ROOT читаются потоком и
+    сверяются с базой пачками по ``batch_size``. Файлы моложе
+    ``min_age`` секунд не трогаются: они могут принадлежать посту,
+    который ещё сохраняется. Между пачками удаления делается пауза
+    ``pause`` секунд. С ``dry_run`` только подсчитывает.
+    """
+
+    def __init__(self, batch_size=500, dry_run=False, pause=0, min_age=3600):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.pause = pause
+        self.min_age = min_age
+        self.kvstore = default.kvstore
+        self.files = 0
+        self.bytes = 0
+        self.sources = 0
+
+    def collect(self):
+        self.collect_sources()
+        self.collect_files(UPLOAD_DIR, self.orphan_uploads)
+        self.collect_files(
+            thumbnail_settings.THUMBNAIL_PREFIX, self.orphan_thumbnails
+        )
+        return self
+
+    def collect_sources(self):
+        """Убирает миниатюры картинок, на которые не ссылаются посты."""
+        keys = self.kvstore._find_keys(identity='thumbnails')
+        for batch in batched(keys, self.batch_size):
+            sources = [self.kvstore._get(key) for key in batch]
+            sources = [
+                source for source in sources
+                if source is not None and source.name.startswith(UPLOAD_DIR)
+            ]
+            referenced = referenced_images(
+                source.name for source in sources
+            )
+            orphans = [
+                source for source in sources
+                if source.name not in referenced
+            ]
+            for source in orphans:
+                for key in self.kvstore._get(
+                    source.key, identity='thumbnails'
+                ) or ():
+                    thumbnail = self.kvstore._get(key)
+                    if thumbnail is not None and thumbnail.exists():
+                        self.files += 1
+                        self.bytes += thumbnail.storage.size(thumbnail.name)
+                if not self.dry_run:
+                    self.kvstore.delete(source)
+            self.sources += len(orphans)
+            self.wait(orphans)
+
+    def collect_files(self, directory, find_orphans):
+        deadline = time.time() - self.min_age
+        files = (
+            (name, stat) for name, stat in walk_files(directory)
+            if stat.st_mtime < deadline
+        )
+        for batch in batched(files, self.batch_size):
+            sizes = dict(batch)
+            orphans = find_orphans(list(sizes))
+            for name in orphans:
+                self.files += 1
+                self.bytes += sizes[name].st_size
+                if not self.dry_run:
+                    default.storage.delete(name)
+            self.wait(orphans)
+
+    @staticmethod
+    def orphan_uploads(names):
+        referenced = referenced_images(names)
+        return [name for name in names if name not in referenced]
+
+    def orphan_thumbnails(self, names):
+        """Файлы миниатюр, о которых не знает хранилище ключей."""
+        return [
+            name for name in names
+            if self.kvstore.get(ImageFile(name, default.storage)) is None
+        ]
+
+    def wait(self, deleted):
+        if deleted and self.pause and not self.dry_run:
+            time.sleep(self.pause)
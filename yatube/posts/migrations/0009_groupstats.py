@@ -0,0 +1,51 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:23
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def create_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    Post = apps.get_model('posts', 'Post')
+    totals = {
+        row['group']: row
+        for row in Post.objects.filter(group__isnull=False).order_by()
+        .values('group')
+        .annotate(
+            posts_count=models.Count('id'),
+            last_post_date=models.Max('pub_date'),
+        )
+    }
+    GroupStats.objects.bulk_create(
+        GroupStats(
+            group_id=group_id,
+            posts_count=totals.get(group_id, {}).get('posts_count', 0),
+            last_post_date=totals.get(group_id, {}).get('last_post_date'),
+        )
+        for group_id in Group.objects.values_list('id', flat=True)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_follow'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('posts_count', models.PositiveIntegerField(db_index=True, default=0, verbose_name='Количество постов')),
+                ('last_post_date', models.DateTimeField(blank=True, null=True, verbose_name='Последняя публикация')),
+                ('top_authors', models.TextField(blank=True, verbose_name='Самые активные авторы')),
+            ],
+            options={
+                'verbose_name': 'Статистика группы',
+                'verbose_name_plural': 'Статистика групп',
+            },
+        ),
+        migrations.RunPython(create_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_groupstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRank',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='rank', serialize=False, to='posts.Post', verbose_name='Пост')),
+                ('comments_count', models.PositiveIntegerField(default=0, verbose_name='Количество комментариев')),
+                ('score', models.FloatField(db_index=True, default=0, verbose_name='Оценка')),
+            ],
+            options={
+                'verbose_name': 'Рейтинг поста',
+                'verbose_name_plural': 'Рейтинги постов',
+            },
+        ),
+    ]
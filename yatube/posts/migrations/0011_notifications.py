@@ -0,0 +1,50 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:32
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0010_postrank'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationSettings',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notification_settings', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('inbox', models.BooleanField(default=False, verbose_name='Уведомления на сайте')),
+                ('email_digest', models.BooleanField(default=False, verbose_name='Сводка на почту')),
+                ('last_digest_at', models.DateTimeField(blank=True, null=True, verbose_name='Последняя сводка')),
+            ],
+            options={
+                'verbose_name': 'Настройки уведомлений',
+                'verbose_name_plural': 'Настройки уведомлений',
+            },
+        ),
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('is_read', models.BooleanField(default=False, verbose_name='Прочитано')),
+                ('in_digest', models.BooleanField(default=False, verbose_name='Отправлено в сводке')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='posts.Post', verbose_name='Пост')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL, verbose_name='Получатель')),
+            ],
+            options={
+                'verbose_name': 'Уведомление',
+                'verbose_name_plural': 'Уведомления',
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', '-created'], name='posts_notif_user_id_f5633a_idx'),
+        ),
+    ]
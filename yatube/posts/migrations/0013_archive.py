@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-19 19:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_feedvisit'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='Текст поста')),
+                ('pub_date', models.DateTimeField(db_index=True, verbose_name='Дата публикации')),
+                ('image', models.ImageField(blank=True, upload_to='posts/', verbose_name='Картинка')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Перенесён в архив')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_posts', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_posts', to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'verbose_name': 'Архивный пост',
+                'verbose_name_plural': 'Архивные посты',
+                'ordering': ['-pub_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField(verbose_name='Текст комментария')),
+                ('created', models.DateTimeField(verbose_name='Дата публикации')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_comments', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='posts.ArchivedPost', verbose_name='Пост')),
+            ],
+            options={
+                'verbose_name': 'Архивный комментарий',
+                'verbose_name_plural': 'Архивные комментарии',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:24
+
+from django.db import migrations, models
+
+
+def remove_duplicates(apps, schema_editor):
+    Notification = apps.get_model('posts', 'Notification')
+    keep = (
+        Notification.objects.order_by().values('user', 'post')
+        .annotate(first_id=models.Min('id')).values('first_id')
+    )
+    Notification.objects.exclude(id__in=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_post_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('user', 'post'), name='unique_notification'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-19 20:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_notification_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedpost',
+            name='image_variants',
+            field=models.TextField(blank=True, editable=False, verbose_name='Варианты картинки'),
+        ),
+    ]
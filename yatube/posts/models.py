@@ -37,6 +37,15 @@ class Post(models.Model):
         upload_to='posts/',
         blank=True
     )
+    # Готовые варианты картинки по вёрсткам (JSON), их записывает
+    # задача posts.generate_image_variants.
+    image_variants = models.TextField(
+        'Варианты картинки',
+        blank=True,
+        editable=False
+    )
+
+    _author_card = None
 
     class Meta:
         ordering = ['-pub_date']
@@ -48,6 +57,24 @@ class Post(models.Model):
         TEXT_LENGTH = 15
         return self.text[:TEXT_LENGTH]
 
+    @property
+    def author_card(self):
+        """Имя автора для карточки поста.
+
+        Ленты подставляют карточки из кеша (users.cache), без них карточка
+        строится по связанному пользователю.
+        """
+        if self._author_card is None:
+            return {
+                'username': self.author.username,
+                'full_name': self.author.get_full_name(),
+            }
+        return self._author_card
+
+    @author_card.setter
+    def author_card(self, card):
+        self._author_card = card
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -96,3 +123,220 @@ class Follow(models.Model):
 
     def __str__(self):
         return f'Подписка {self.user} на {self.author}'
+
+
+class GroupStats(models.Model):
+    """Предрассчитанная статистика группы для каталога групп.
+
+    Счётчик и дата последней публикации обновляются сигналами при
+    сохранении постов, список авторов — командой refresh_group_stats.
+    """
+    TOP_AUTHORS_SEPARATOR = ','
+
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Группа'
+    )
+    posts_count = models.PositiveIntegerField(
+        'Количество постов',
+        default=0,
+        db_index=True
+    )
+    last_post_date = models.DateTimeField(
+        'Последняя публикация',
+        blank=True,
+        null=True
+    )
+    top_authors = models.TextField('Самые активные авторы', blank=True)
+
+    class Meta:
+        verbose_name = 'Статистика группы'
+        verbose_name_plural = 'Статистика групп'
+
+    def __str__(self):
+        return f'Статистика группы {self.group}'
+
+    @property
+    def top_authors_list(self):
+        if not self.top_authors:
+            return []
+        return self.top_authors.split(self.TOP_AUTHORS_SEPARATOR)
+
+
+class PostRank(models.Model):
+    """Место поста в ленте популярного.
+
+    Оценка растёт с числом комментариев и со временем публикации, поэтому
+    лента популярного — это чтение по индексу ``score``.
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rank',
+        verbose_name='Пост'
+    )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0
+    )
+    score = models.FloatField('Оценка', default=0, db_index=True)
+
+    class Meta:
+        verbose_name = 'Рейтинг поста'
+        verbose_name_plural = 'Рейтинги постов'
+
+    def __str__(self):
+        return f'Рейтинг поста {self.post_id}: {self.score}'
+
+
+class NotificationSettings(models.Model):
+    """Подписка пользователя на уведомления о новых постах авторов."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='notification_settings',
+        verbose_name='Пользователь'
+    )
+    inbox = models.BooleanField('Уведомления на сайте', default=False)
+    email_digest = models.BooleanField('Сводка на почту', default=False)
+    last_digest_at = models.DateTimeField(
+        'Последняя сводка',
+        blank=True,
+        null=True
+    )
+
+    class Meta:
+        verbose_name = 'Настройки уведомлений'
+        verbose_name_plural = 'Настройки уведомлений'
+
+    def __str__(self):
+        return f'Настройки уведомлений {self.user}'
+
+
+class Notification(models.Model):
+    """Уведомление подписчику о новом посте автора."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Получатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name='Пост'
+    )
+    created = models.DateTimeField('Создано', auto_now_add=True)
+    is_read = models.BooleanField('Прочитано', default=False)
+    in_digest = models.BooleanField('Отправлено в сводке', default=False)
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [models.Index(fields=['user', '-created'])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'post'], name='unique_notification'
+            ),
+        ]
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+
+    def __str__(self):
+        return f'Уведомление {self.user} о посте {self.post_id}'
+
+
+class FeedVisit(models.Model):
+    """Время последнего просмотра ленты подписок пользователем."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='feed_visit',
+        verbose_name='Пользователь'
+    )
+    last_seen = models.DateTimeField('Последний просмотр')
+
+    class Meta:
+        verbose_name = 'Просмотр ленты подписок'
+        verbose_name_plural = 'Просмотры ленты подписок'
+
+    def __str__(self):
+        return f'Просмотр ленты {self.user}'
+
+
+class ArchivedPost(models.Model):
+    """Пост, перенесённый из горячей таблицы командой archive_posts.
+
+    Ключ совпадает с ключом исходного поста, поэтому старые ссылки на
+    страницу поста продолжают работать.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField('Текст поста')
+    pub_date = models.DateTimeField('Дата публикации', db_index=True)
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    image = models.ImageField('Картинка', upload_to='posts/', blank=True)
+    image_variants = models.TextField(
+        'Варианты картинки',
+        blank=True,
+        editable=False
+    )
+    archived_at = models.DateTimeField('Перенесён в архив', auto_now_add=True)
+
+    _author_card = None
+    author_card = Post.author_card
+
+    class Meta:
+        ordering = ['-pub_date']
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+    def __str__(self):
+        TEXT_LENGTH = 15
+        return self.text[:TEXT_LENGTH]
+
+
+class ArchivedComment(models.Model):
+    """Комментарий архивного поста."""
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор'
+    )
+    text = models.TextField('Текст комментария')
+    created = models.DateTimeField('Дата публикации')
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'Архивный комментарий'
+        verbose_name_plural = 'Архивные комментарии'
+
+    def __str__(self):
+        TEXT_LENGTH = 15
+        return self.text[:TEXT_LENGTH]
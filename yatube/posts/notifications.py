@@ -0,0 +1,108 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+
+from .feed import add_unread
+from .models import (
+    FeedVisit, Follow, Notification, NotificationSettings, Post
+)
+
+
+def follower_chunks(author_id, chunk_size):
+    """Ключи подписчиков автора пачками по возрастанию ключа подписки."""
+    last_pk = 0
+    while True:
+        chunk = list(
+            Follow.objects.filter(author_id=author_id, pk__gt=last_pk)
+            .order_by('pk').values_list('pk', 'user_id')[:chunk_size]
+        )
+        if not chunk:
+            return
+        last_pk = chunk[-1][0]
+        yield [user_id for _, user_id in chunk]
+
+
+def fanout_post(post_id):
+    """Раскладывает уведомления о посте подписчикам автора.
+
+    Подписки читаются пачками: всем подписчикам увеличивается счётчик
+    непрочитанного, а уведомления для подписавшихся на них пользователей
+    записываются одним bulk_create на пачку. Повтор упавшей задачи не
+    создаёт уведомлений второй раз, а счётчик непрочитанного можно
+    лишь завысить до следующего просмотра ленты.
+    """
+    post = Post.objects.filter(pk=post_id).values(
+        'author_id', 'pub_date'
+    ).first()
+    if post is None:
+        return
+    chunk_size = settings.NOTIFICATION_FANOUT_CHUNK
+    for user_ids in follower_chunks(post['author_id'], chunk_size):
+        # Кто открывал ленту после публикации, уже видел этот пост.
+        seen = FeedVisit.objects.filter(
+            user_id__in=user_ids, last_seen__gte=post['pub_date']
+        ).values_list('user_id', flat=True)
+        add_unread(set(user_ids).difference(seen))
+        recipients = NotificationSettings.objects.filter(
+            Q(inbox=True) | Q(email_digest=True), user_id__in=user_ids
+        ).values_list('user_id', flat=True)
+        Notification.objects.bulk_create(
+            [Notification(user_id=user_id, post_id=post_id)
+             for user_id in recipients],
+            batch_size=chunk_size,
+            ignore_conflicts=True,
+        )
+
+
+def build_digest(user, notifications):
+    lines = ['Новые записи авторов, на которых вы подписаны:', '']
+    for notification in notifications:
+        post = notification.post
+        url = settings.SITE_URL + reverse('posts:post_detail', args=[post.id])
+        lines += [f'{post.author.username}: {post}…', url, '']
+    return EmailMessage(
+        subject='Новые записи на Yatube',
+        body='\n'.join(lines),
+        to=[user.email],
+    )
+
+
+def send_digests(chunk_size=500):
+    """Отправляет каждому подписчику не больше одной сводки за интервал
+    NOTIFICATION_DIGEST_INTERVAL. Возвращает количество сводок."""
+    now = timezone.now()
+    due = now - timedelta(seconds=settings.NOTIFICATION_DIGEST_INTERVAL)
+    subscribers = NotificationSettings.objects.filter(
+        Q(last_digest_at__isnull=True) | Q(last_digest_at__lte=due),
+        email_digest=True,
+    ).exclude(user__email='').select_related('user').order_by('user_id')
+    sent = 0
+    last_user_id = 0
+    while True:
+        chunk = list(subscribers.filter(user_id__gt=last_user_id)[:chunk_size])
+        if not chunk:
+            return sent
+        last_user_id = chunk[-1].user_id
+        users = {item.user_id: item.user for item in chunk}
+        pending = defaultdict(list)
+        for notification in Notification.objects.filter(
+            user_id__in=users, in_digest=False
+        ).select_related('post__author').order_by('user_id', 'created'):
+            pending[notification.user_id].append(notification)
+        messages = [
+            build_digest(users[user_id], notifications)
+            for user_id, notifications in pending.items()
+        ]
+        get_connection().send_messages(messages)
+        Notification.objects.filter(
+            id__in=[item.id for items in pending.values() for item in items]
+        ).update(in_digest=True)
+        NotificationSettings.objects.filter(user_id__in=pending).update(
+            last_digest_at=now
+        )
+        sent += len(messages)
@@ -0,0 +1,85 @@
+import math
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import Post, PostRank
+
+RANKING_EPOCH = datetime(2022, 1, 1, tzinfo=timezone.utc)
+# За это время оценка поста вырастает на единицу, что равносильно
+# десятикратному числу комментариев у более старого поста.
+DECAY_SECONDS = 45000
+
+
+def hot_score(comments_count, pub_date):
+    """Оценка поста: логарифм активности плюс время публикации.
+
+    Новизна учитывается сдвигом по времени, а не делением на возраст,
+    поэтому оценка не устаревает и её не нужно пересчитывать по таймеру.
+    """
+    activity = math.log10(comments_count + 1)
+    age = (pub_date - RANKING_EPOCH).total_seconds()
+    return round(activity + age / DECAY_SECONDS, 7)
+
+
+def post_created(post):
+    PostRank.objects.get_or_create(
+        post=post,
+        defaults={'score': hot_score(0, post.pub_date)},
+    )
+
+
+def comments_changed(post_id, delta):
+    """Обновляет счётчик комментариев и оценку одного поста."""
+    with transaction.atomic():
+        updated = PostRank.objects.filter(post_id=post_id).update(
+            comments_count=F('comments_count') + delta
+        )
+        if not updated:
+            return
+        comments_count, pub_date = PostRank.objects.filter(
+            post_id=post_id
+        ).values_list('comments_count', 'post__pub_date').get()
+        PostRank.objects.filter(post_id=post_id).update(
+            score=hot_score(comments_count, pub_date)
+        )
+
+
+def rank_posts(batch_size=1000):
+    """Пересчитывает рейтинги всех постов пачками по первичному ключу.
+
+    Возвращает количество обработанных постов.
+    """
+    processed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk')
+            .annotate(comments_total=Count('comments'))
+            .values_list('pk', 'pub_date', 'comments_total')[:batch_size]
+        )
+        if not batch:
+            return processed
+        last_pk = batch[-1][0]
+        ranks = [
+            PostRank(
+                post_id=pk,
+                comments_count=comments_total,
+                score=hot_score(comments_total, pub_date),
+            )
+            for pk, pub_date, comments_total in batch
+        ]
+        existing = set(PostRank.objects.filter(
+            post_id__in=[rank.post_id for rank in ranks]
+        ).values_list('post_id', flat=True))
+        with transaction.atomic():
+            PostRank.objects.bulk_create(
+                [rank for rank in ranks if rank.post_id not in existing]
+            )
+            PostRank.objects.bulk_update(
+                [rank for rank in ranks if rank.post_id in existing],
+                ('comments_count', 'score'),
+            )
+        processed += len(batch)
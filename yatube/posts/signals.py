@@ -0,0 +1,130 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core import edge, metrics
+from core.tasks import enqueue
+from . import feed, ranking, stats
+from .models import Comment, Follow, Group, GroupStats, Post
+
+
+@receiver(post_save, sender=Group)
+def create_group_stats(sender, instance, created, **kwargs):
+    if created:
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_values(sender, instance, **kwargs):
+    """Запоминает прежние группу и картинку поста: пост переносится в
+    статистике групп, а для новой картинки создаются варианты."""
+    previous = None
+    if instance.pk is not None:
+        previous = Post.objects.filter(pk=instance.pk).values_list(
+            'group_id', 'image'
+        ).first()
+    instance._previous_group_id, instance._previous_image = (
+        previous or (None, '')
+    )
+    if instance.image.name != instance._previous_image:
+        instance.image_variants = ''
+
+
+@receiver(post_save, sender=Post)
+def update_group_stats(sender, instance, created, **kwargs):
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    if not created and previous_group_id == instance.group_id:
+        return
+    if previous_group_id is not None:
+        stats.post_removed(previous_group_id)
+    if instance.group_id is not None:
+        stats.post_added(instance.group_id, instance.pub_date)
+
+
+@receiver(post_save, sender=Post)
+def create_post_rank(sender, instance, created, **kwargs):
+    if created:
+        ranking.post_created(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_created_post(sender, instance, created, **kwargs):
+    if created:
+        metrics.increment('posts_created')
+
+
+@receiver(post_save, sender=Post)
+def notify_followers(sender, instance, created, **kwargs):
+    if created:
+        enqueue('posts.fanout_post', post_id=instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def generate_image_variants(sender, instance, **kwargs):
+    image = instance.image.name
+    if image and image != getattr(instance, '_previous_image', ''):
+        enqueue('posts.generate_image_variants', path=image)
+
+
+@receiver(post_delete, sender=Post)
+def remove_post_from_group_stats(sender, instance, **kwargs):
+    if instance.group_id is not None:
+        stats.post_removed(instance.group_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    """Очищает в кеше прокси страницы, на которых виден пост."""
+    if not edge.purge_enabled():
+        return
+    group_ids = {
+        instance.group_id, getattr(instance, '_previous_group_id', None)
+    } - {None}
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    edge.purge(
+        'posts', 'groups', f'post-{instance.pk}',
+        f'profile-{instance.author.username}',
+        *(f'group-{slug}' for slug in slugs),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def rank_commented_post(sender, instance, created, **kwargs):
+    if created:
+        ranking.comments_changed(instance.post_id, 1)
+
+
+@receiver(post_save, sender=Comment)
+def count_added_comment(sender, instance, created, **kwargs):
+    if created:
+        metrics.increment('comments_added')
+
+
+@receiver(post_delete, sender=Comment)
+def rank_uncommented_post(sender, instance, **kwargs):
+    ranking.comments_changed(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    edge.purge(f'post-{instance.post_id}')
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def reset_unread_count(sender, instance, **kwargs):
+    feed.reset_unread(instance.user_id)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        metrics.increment('follows', action='follow')
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    metrics.increment('follows', action='unfollow')
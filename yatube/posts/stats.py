@@ -0,0 +1,92 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, DateTimeField, F, Max, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Group, GroupStats, Post
+
+TOP_AUTHORS_COUNT = 3
+
+
+def post_added(group_id, pub_date):
+    """Учитывает новый пост группы без пересчёта всей статистики.
+
+    Пост, перенесённый из другой группы, может быть старше последнего
+    поста группы, поэтому дата только сдвигается вперёд.
+    """
+    pub_date_value = Value(pub_date, output_field=DateTimeField())
+    updated = GroupStats.objects.filter(group_id=group_id).update(
+        posts_count=F('posts_count') + 1,
+        last_post_date=Greatest(
+            Coalesce('last_post_date', pub_date_value), pub_date_value
+        ),
+    )
+    if not updated:
+        GroupStats.objects.get_or_create(
+            group_id=group_id,
+            defaults={'posts_count': 1, 'last_post_date': pub_date},
+        )
+
+
+def post_removed(group_id, count=1):
+    """Уменьшает счётчик постов группы на ``count``.
+
+    Дата последней публикации и авторы уточняются при следующем
+    запуске refresh_group_stats.
+    """
+    GroupStats.objects.filter(group_id=group_id, posts_count__gt=0).update(
+        posts_count=Greatest(F('posts_count') - count, 0)
+    )
+
+
+def get_top_authors():
+    """Самые активные авторы каждой группы одним агрегирующим запросом."""
+    top_authors = defaultdict(list)
+    rows = (
+        Post.objects.filter(group__isnull=False).order_by()
+        .values('group', 'author__username')
+        .annotate(posts_count=Count('id'))
+        .order_by('group', '-posts_count', 'author__username')
+    )
+    for row in rows.iterator():
+        authors = top_authors[row['group']]
+        if len(authors) < TOP_AUTHORS_COUNT:
+            authors.append(row['author__username'])
+    return top_authors
+
+
+def refresh_group_stats(batch_size=500):
+    """Полностью пересчитывает статистику всех групп.
+
+    Возвращает количество обновлённых записей.
+    """
+    totals = {
+        row['group']: row
+        for row in Post.objects.filter(group__isnull=False).order_by()
+        .values('group')
+        .annotate(posts_count=Count('id'), last_post_date=Max('pub_date'))
+        .iterator()
+    }
+    top_authors = get_top_authors()
+    existing = set(GroupStats.objects.values_list('group_id', flat=True))
+    created, updated = [], []
+    for group_id in Group.objects.values_list('id', flat=True).iterator():
+        row = totals.get(group_id, {})
+        stats = GroupStats(
+            group_id=group_id,
+            posts_count=row.get('posts_count', 0),
+            last_post_date=row.get('last_post_date'),
+            top_authors=GroupStats.TOP_AUTHORS_SEPARATOR.join(
+                top_authors.get(group_id, [])
+            ),
+        )
+        (updated if group_id in existing else created).append(stats)
+    with transaction.atomic():
+        GroupStats.objects.bulk_create(created, batch_size=batch_size)
+        GroupStats.objects.bulk_update(
+            updated,
+            ('posts_count', 'last_post_date', 'top_authors'),
+            batch_size=batch_size,
+        )
+    return len(created) + len(updated)
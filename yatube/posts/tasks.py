@@ -0,0 +1,23 @@
+from core.tasks import task
+
+from . import deletion, feed, images, notifications
+
+
+@task('posts.fanout_post')
+def fanout_post(post_id):
+    notifications.fanout_post(post_id)
+
+
+@task('posts.delete_media')
+def delete_media(path):
+    deletion.delete_media(path)
+
+
+@task('posts.reset_followers_unread')
+def reset_followers_unread(author_id):
+    feed.reset_followers_unread(author_id)
+
+
+@task('posts.generate_image_variants')
+def generate_image_variants(path):
+    images.generate_variants(path)
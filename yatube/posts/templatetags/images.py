@@ -0,0 +1,64 @@
+import json
+import logging
+
+from django import template
+from django.conf import settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+
+logger = logging.getLogger(__name__)
+register = template.Library()
+
+# Ширина единственной миниатюры, пока варианты не созданы.
+FALLBACK_WIDTH = 960
+
+
+def fallback_image(image, layout):
+    """Одна миниатюра шириной FALLBACK_WIDTH, как до появления srcset.
+
+    Как и ``{% thumbnail %}``, при ошибке обработки картинки возвращает
+    None, если не включён THUMBNAIL_DEBUG.
+    """
+    # Движок миниатюр загружается при первой картинке без вариантов, а
+    # не при загрузке шаблонов.
+    from posts.images import geometry
+    from sorl.thumbnail import get_thumbnail
+
+    try:
+        thumbnail = get_thumbnail(
+            image, geometry(layout, FALLBACK_WIDTH),
+            crop='center', upscale=True,
+        )
+    except Exception:
+        if thumbnail_settings.THUMBNAIL_DEBUG:
+            raise
+        logger.exception('Не удалось создать миниатюру картинки')
+        return None
+    if thumbnail.size is None:
+        return None
+    return {
+        'url': thumbnail.url,
+        'width': thumbnail.width,
+        'height': thumbnail.height,
+    }
+
+
+@register.inclusion_tag('posts/includes/responsive_image.html')
+def responsive_image(post, layout, css_class=''):
+    """Картинка поста с srcset и sizes для вёрстки из IMAGE_VARIANTS.
+
+    Выводит только варианты, уже созданные задачей
+    posts.generate_image_variants; до этого отдаётся одна миниатюра.
+    """
+    if not post.image:
+        return {}
+    variants = json.loads(post.image_variants or '{}').get(layout)
+    if variants is None:
+        return {
+            'image': fallback_image(post.image, layout),
+            'css_class': css_class,
+        }
+    return {
+        **variants,
+        'sizes': settings.IMAGE_VARIANTS[layout]['sizes'],
+        'css_class': css_class,
+    }
@@ -0,0 +1,89 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.pagination import EstimatedCountPaginator
+from posts.admin import PostAdmin
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+        for number in range(5):
+            author = User.objects.create_user(username=f'Author{number}')
+            post = Post.objects.create(
+                author=author, group=cls.group, text=f'Пост {number}'
+            )
+            Comment.objects.create(post=post, author=author, text='Текст')
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.admin_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов списка не зависит от количества строк"""
+        for name in ('posts_post_changelist', 'posts_comment_changelist',
+                     'posts_follow_changelist'):
+            with self.subTest(name=name):
+                url = reverse(f'admin:{name}')
+                self.admin_client.get(url)
+                before = self.count_queries(url)
+                for number in range(3):
+                    author = User.objects.create_user(
+                        username=f'{name}{number}'
+                    )
+                    post = Post.objects.create(
+                        author=author, group=self.group, text='Ещё пост'
+                    )
+                    Comment.objects.create(
+                        post=post, author=author, text='Текст'
+                    )
+                    post.author.following.create(user=self.admin)
+                self.assertEqual(self.count_queries(url), before)
+
+    def test_changelist_pages_by_cursor(self):
+        """Страницы списка постов листаются по курсору"""
+        url = reverse('admin:posts_post_changelist')
+        texts = []
+        with mock.patch.object(PostAdmin, 'list_per_page', 2):
+            while url:
+                response = self.admin_client.get(url)
+                changelist = response.context['cl']
+                texts += [post.text for post in changelist.result_list]
+                next_url = changelist.next_url
+                url = next_url and reverse(
+                    'admin:posts_post_changelist'
+                ) + next_url
+        self.assertEqual(
+            texts, [f'Пост {number}' for number in reversed(range(5))]
+        )
+
+    def test_estimated_count_for_large_table(self):
+        """Без фильтров число строк берётся из статистики СУБД"""
+        with mock.patch(
+            'core.pagination.estimate_count', return_value=50000
+        ):
+            paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+            self.assertEqual(paginator.count, 50000)
+            paginator = EstimatedCountPaginator(
+                Post.objects.filter(group=self.group), 10
+            )
+            self.assertEqual(paginator.count, 5)
@@ -0,0 +1,171 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.tasks import run_tasks
+from posts.archive import archive_posts
+from posts.models import (
+    ArchivedComment, ArchivedPost, Comment, Group, GroupStats, Post
+)
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+small_gif = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+
+    def setUp(self):
+        self.old_post = Post.objects.create(
+            author=self.user, group=self.group, text='Старый пост'
+        )
+        Post.objects.filter(pk=self.old_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        self.comment = Comment.objects.create(
+            post=self.old_post, author=self.user, text='Старый комментарий'
+        )
+        self.new_post = Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост'
+        )
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_old_posts_moved_with_comments(self):
+        """Старые посты переносятся в архив вместе с комментариями"""
+        out = StringIO()
+        call_command('archive_posts', batch_size=1, stdout=out)
+        self.assertIn('1', out.getvalue())
+        self.assertFalse(Post.objects.filter(pk=self.old_post.pk).exists())
+        self.assertTrue(Post.objects.filter(pk=self.new_post.pk).exists())
+        archived = ArchivedPost.objects.get(pk=self.old_post.pk)
+        self.assertEqual(archived.text, 'Старый пост')
+        self.assertEqual(archived.group, self.group)
+        self.assertEqual(
+            ArchivedComment.objects.get(pk=self.comment.pk).post, archived
+        )
+
+    def test_archived_post_detail(self):
+        """Страница архивного поста доступна, но без формы комментария"""
+        archive_posts()
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', args=[self.old_post.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['archived'])
+        self.assertContains(response, 'Старый комментарий')
+        self.assertNotContains(
+            response, reverse('posts:add_comment', args=[self.old_post.pk])
+        )
+
+    def test_feeds_and_profile_archive(self):
+        """Ленты показывают только свежие посты, архив — отдельно"""
+        archive_posts()
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertEqual(list(response.context['page_obj']), [self.new_post])
+        response = self.guest_client.get(
+            reverse('posts:profile', args=[self.user.username])
+        )
+        self.assertEqual(response.context['archived_count'], 1)
+        response = self.guest_client.get(
+            reverse('posts:profile_archive', args=[self.user.username])
+        )
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.old_post.pk],
+        )
+
+    def test_batch_queries_do_not_grow_with_comments(self):
+        """Число запросов пачки не зависит от числа комментариев,
+        счётчик группы уменьшается на число перенесённых постов"""
+        Comment.objects.bulk_create(
+            Comment(post=self.old_post, author=self.user, text='Текст')
+            for _ in range(40)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            archive_posts()
+        self.assertLess(len(queries), 15)
+        self.assertEqual(ArchivedComment.objects.count(), 41)
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 1
+        )
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ArchivedImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=self.user,
+            text='Старый пост',
+            image=SimpleUploadedFile('small.gif', small_gif, 'image/gif'),
+        )
+        Post.objects.filter(pk=self.post.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_archived_post_with_image(self):
+        """Архивный пост с картинкой показывается с её вариантами"""
+        run_tasks()
+        archive_posts()
+        archived = ArchivedPost.objects.get(pk=self.post.pk)
+        self.assertIn('card', archived.image_variants)
+        for url in (
+            reverse('posts:post_detail', args=[self.post.pk]),
+            reverse('posts:profile_archive', args=[self.user.username]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertContains(response, 'srcset=')
+
+    def test_backfill_command_covers_archive(self):
+        """Команда создаёт варианты и для архивных картинок"""
+        archive_posts()
+        out = StringIO()
+        call_command('generate_image_variants', stdout=out)
+        self.assertIn('Обработано картинок: 1', out.getvalue())
+        self.assertIn(
+            'card', ArchivedPost.objects.get(pk=self.post.pk).image_variants
+        )
@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.tasks import run_tasks
+from posts.feed import unread_key
+from posts.models import Comment, Follow, Group, GroupStats, Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+small_gif = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def media_files():
+    return {
+        os.path.relpath(os.path.join(root, name), TEMP_MEDIA_ROOT)
+        for root, _, names in os.walk(TEMP_MEDIA_ROOT) for name in names
+    }
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_DELETE_BATCH_SIZE=2)
+class PostDeleteTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.another_user = User.objects.create_user(username='AnotherUser')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=self.user,
+            group=self.group,
+            text='Текст поста',
+            image=SimpleUploadedFile('small.gif', small_gif, 'image/gif'),
+        )
+        Comment.objects.bulk_create(
+            Comment(post=self.post, author=self.user, text='Комментарий')
+            for _ in range(5)
+        )
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+        self.another_client = Client()
+        self.another_client.force_login(self.another_user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_author_deletes_post(self):
+        """Автор удаляет пост; файлы удаляются фоновой задачей"""
+        url = reverse('posts:post_delete', args=[self.post.pk])
+        run_tasks()
+        files = media_files()
+        self.assertGreater(len(files), 1)
+        response = self.author_client.post(url)
+        self.assertRedirects(
+            response, reverse('posts:profile', args=[self.user.username])
+        )
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 0
+        )
+        self.assertEqual(media_files(), files)
+        run_tasks()
+        self.assertEqual(media_files(), set())
+
+    def test_confirmation_and_permissions(self):
+        """GET показывает подтверждение, чужой пост удалить нельзя"""
+        url = reverse('posts:post_delete', args=[self.post.pk])
+        response = self.author_client.get(url)
+        self.assertTemplateUsed(response, 'posts/post_delete.html')
+        response = self.another_client.post(url)
+        self.assertRedirects(
+            response, reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertTrue(Post.objects.filter(pk=self.post.pk).exists())
+
+    def test_followers_unread_reset_by_task(self):
+        """Счётчики непрочитанного у подписчиков сбрасывает фоновая
+        задача, а не запрос на удаление"""
+        Follow.objects.create(user=self.another_user, author=self.user)
+        cache.set(unread_key(self.another_user.pk), 5)
+        self.author_client.post(
+            reverse('posts:post_delete', args=[self.post.pk])
+        )
+        self.assertEqual(cache.get(unread_key(self.another_user.pk)), 5)
+        run_tasks()
+        self.assertIsNone(cache.get(unread_key(self.another_user.pk)))
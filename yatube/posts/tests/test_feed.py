@@ -0,0 +1,100 @@
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.tasks import run_tasks
+from posts.feed import UNREAD_LOCAL_CACHE_TIMEOUT, get_unread_count
+from posts.models import Follow, Post
+
+User = get_user_model()
+TEMP_CACHE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': TEMP_CACHE_DIR,
+    }
+}
+
+
+class UnreadFeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.follower = User.objects.create_user(username='Follower')
+        Follow.objects.create(user=cls.follower, author=cls.author)
+        Post.objects.create(author=cls.author, text='Старый пост')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.follower_client = Client()
+        self.follower_client.force_login(self.follower)
+
+    def tearDown(self):
+        cache.clear()
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_unread_counter_updated_by_fanout(self):
+        """С общим кешем счётчик сбрасывается при просмотре ленты и
+        растёт при раздаче"""
+        self.assertEqual(get_unread_count(self.follower), 1)
+        self.follower_client.get(reverse('posts:follow_index'))
+        self.assertEqual(get_unread_count(self.follower), 0)
+        Post.objects.create(author=self.author, text='Новый пост')
+        run_tasks()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.follower), 1)
+        cache.clear()
+
+    def test_unread_counter_expires_without_shared_cache(self):
+        """С кешем процесса счётчик недолго берётся из кеша, а затем
+        пересчитывается по базе, даже если раздача прошла в другом
+        процессе"""
+        self.follower_client.get(reverse('posts:follow_index'))
+        Post.objects.create(author=self.author, text='Новый пост')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_unread_count(self.follower), 0)
+        later = time.time() + UNREAD_LOCAL_CACHE_TIMEOUT + 1
+        with mock.patch(
+            'django.core.cache.backends.locmem.time.time',
+            return_value=later,
+        ):
+            self.assertEqual(get_unread_count(self.follower), 1)
+
+    def test_new_posts_marked_since_last_visit(self):
+        """Посты после прошлого просмотра помечены как новые"""
+        self.follower_client.get(reverse('posts:follow_index'))
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.follower_client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'новое', count=1)
+
+    def test_switcher_loads_unread_count(self):
+        """Вкладка подписок загружает количество новых постов отдельным
+        некешируемым запросом"""
+        response = self.follower_client.get(reverse('posts:popular'))
+        self.assertContains(response, reverse('posts:follow_unread'))
+        response = self.follower_client.get(reverse('posts:follow_unread'))
+        self.assertContains(response, '<span class="badge bg-primary">1')
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_cached_index_has_no_unread_count(self):
+        """Главная из общего кеша не показывает чужой счётчик"""
+        response = self.follower_client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'badge bg-primary')
+        other_client = Client()
+        other_client.force_login(
+            User.objects.create_user(username='Other')
+        )
+        response = other_client.get(reverse('posts:follow_unread'))
+        self.assertNotContains(response, 'badge')
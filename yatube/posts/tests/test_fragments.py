@@ -0,0 +1,94 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class FeedFragmentTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        now = timezone.now()
+        cls.posts = []
+        for number in range(settings.POSTS_PER_PAGE * 2 + 3):
+            post = Post.objects.create(
+                author=cls.user, group=cls.group, text=f'Пост {number}'
+            )
+            post.pub_date = now - timedelta(minutes=number)
+            post.save()
+            cls.posts.append(post)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_all_fragments(self, url, cursor):
+        texts = []
+        while cursor:
+            response = self.guest_client.get(url, {'cursor': cursor})
+            self.assertEqual(response.status_code, 200)
+            texts += [post.text for post in response.context['posts']]
+            cursor = response.get('X-Next-Cursor')
+        return texts
+
+    def test_fragments_continue_full_page(self):
+        """Фрагменты продолжают первую страницу без пропусков и повторов"""
+        pages = {
+            reverse('posts:index'): reverse('posts:index_fragment'),
+            reverse('posts:group_list', args=[self.group.slug]): reverse(
+                'posts:group_fragment', args=[self.group.slug]
+            ),
+            reverse('posts:profile', args=[self.user.username]): reverse(
+                'posts:profile_fragment', args=[self.user.username]
+            ),
+        }
+        expected = [post.text for post in self.posts]
+        for page_url, fragment_url in pages.items():
+            with self.subTest(page_url=page_url):
+                cache.clear()
+                response = self.guest_client.get(page_url)
+                self.assertEqual(
+                    response.context['fragment_url'], fragment_url
+                )
+                texts = [post.text for post in response.context['page_obj']]
+                texts += self.get_all_fragments(
+                    fragment_url, response.context['next_cursor']
+                )
+                self.assertEqual(texts, expected)
+
+    def test_fragment_has_no_page_layout(self):
+        """Фрагмент содержит только карточки постов"""
+        response = self.guest_client.get(reverse('posts:index_fragment'))
+        self.assertTemplateUsed(
+            response, 'posts/includes/posts_fragment.html'
+        )
+        self.assertTemplateNotUsed(response, 'base.html')
+        self.assertContains(response, 'Пост 0')
+
+    def test_invalid_cursor(self):
+        """Неверный курсор — ошибка 400"""
+        response = self.guest_client.get(
+            reverse('posts:index_fragment'), {'cursor': 'broken'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_follow_fragment_requires_login(self):
+        """Фрагмент ленты подписок доступен только авторизованным"""
+        response = self.guest_client.get(reverse('posts:follow_fragment'))
+        self.assertEqual(response.status_code, 302)
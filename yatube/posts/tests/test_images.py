@@ -0,0 +1,110 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.tasks import run_tasks
+from posts.images import geometry
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+small_gif = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def thumbnail_files():
+    return {
+        name
+        for _, _, names in os.walk(os.path.join(TEMP_MEDIA_ROOT, 'cache'))
+        for name in names
+    }
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ResponsiveImageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            author=self.user,
+            text='Текст поста',
+            image=SimpleUploadedFile('small.gif', small_gif, 'image/gif'),
+        )
+
+    def tearDown(self):
+        cache.clear()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_variants_generated_after_upload(self):
+        """Варианты картинки создаются фоновой задачей после загрузки,
+        одинаковые размеры разных вёрсток не дублируются"""
+        run_tasks()
+        geometries = {
+            geometry(layout, width)
+            for layout, options in settings.IMAGE_VARIANTS.items()
+            for width in options['widths']
+        }
+        variants = len(geometries) * len(settings.IMAGE_VARIANT_FORMATS)
+        files = thumbnail_files()
+        self.assertEqual(len(files), variants)
+        self.guest_client.get(reverse('posts:index'))
+        self.guest_client.get(
+            reverse('posts:post_detail', args=[self.post.pk])
+        )
+        self.assertEqual(thumbnail_files(), files)
+
+    def test_pages_render_srcset(self):
+        """Лента и страница поста отдают srcset, sizes и webp"""
+        run_tasks()
+        for url in (reverse('posts:index'),
+                    reverse('posts:post_detail', args=[self.post.pk])):
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, '<source type="image/webp"')
+                self.assertContains(response, ' 480w, ')
+                self.assertContains(response, 'sizes="(max-width: ')
+
+    def test_thumbnail_rendered_until_variants_generated(self):
+        """До фоновой задачи страница отдаёт одну миниатюру 960x339,
+        а не исходную картинку"""
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertNotContains(response, f'src="{self.post.image.url}"')
+        self.assertNotContains(response, 'srcset=')
+        self.assertContains(response, 'width="960" height="339"')
+        self.assertEqual(len(thumbnail_files()), 1)
+
+    def test_replaced_image_drops_variants(self):
+        """Новая картинка сбрасывает варианты прежней"""
+        run_tasks()
+        self.post.refresh_from_db()
+        self.assertIn('card', self.post.image_variants)
+        self.post.image = SimpleUploadedFile('new.gif', small_gif, 'image/gif')
+        self.post.save()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.image_variants, '')
+        run_tasks()
+        self.post.refresh_from_db()
+        self.assertIn('card', self.post.image_variants)
@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.tasks import run_tasks
+from posts.models import Post
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+small_gif = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+def media_files():
+    return {
+        os.path.relpath(os.path.join(root, name), TEMP_MEDIA_ROOT)
+        for root, _, names in os.walk(TEMP_MEDIA_ROOT) for name in names
+    }
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class MediaGarbageTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.post = Post.objects.create(
+            author=self.user,
+            text='Текст поста',
+            image=SimpleUploadedFile('old.gif', small_gif, 'image/gif'),
+        )
+        self.old_image = self.post.image.name
+        run_tasks()
+        self.old_files = media_files()
+        self.client.post(
+            reverse('posts:post_edit', args=[self.post.pk]),
+            {
+                'text': 'Новая картинка',
+                'image': SimpleUploadedFile('new.gif', small_gif, 'image/gif'),
+            },
+        )
+        cache.clear()
+        run_tasks()
+        self.post.refresh_from_db()
+        stray = os.path.join(TEMP_MEDIA_ROOT, 'cache', 'stray.jpg')
+        with open(stray, 'wb') as file:
+            file.write(b'x' * 10)
+
+    def tearDown(self):
+        cache.clear()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def collect(self, *args):
+        out = StringIO()
+        call_command(
+            'collect_media_garbage', '--min-age=0', *args, stdout=out
+        )
+        return out.getvalue()
+
+    def test_dry_run_keeps_files(self):
+        """Пробный запуск только считает файлы к удалению"""
+        files = media_files()
+        output = self.collect('--dry-run')
+        self.assertIn(
+            f'Будет удалено файлов: {len(self.old_files) + 1} ', output
+        )
+        self.assertEqual(media_files(), files)
+
+    def test_orphans_deleted(self):
+        """Удаляются старая картинка, её миниатюры и лишние файлы"""
+        files = media_files()
+        output = self.collect('--batch-size=1')
+        self.assertIn(f'Удалено файлов: {len(self.old_files) + 1} ', output)
+        self.assertEqual(
+            media_files(),
+            files - self.old_files - {os.path.join('cache', 'stray.jpg')},
+        )
+        self.assertIn(self.post.image.name, media_files())
+        self.assertNotIn(self.old_image, media_files())
+        self.assertIn('Удалено файлов: 0', self.collect())
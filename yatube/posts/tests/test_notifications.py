@@ -0,0 +1,92 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.models import Task
+from core.tasks import run_tasks
+from posts.models import Follow, Notification, NotificationSettings, Post
+from posts.notifications import fanout_post, send_digests
+
+User = get_user_model()
+
+
+@override_settings(NOTIFICATION_FANOUT_CHUNK=2)
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='Author')
+        cls.followers = [
+            User.objects.create_user(
+                username=f'Follower{i}', email=f'follower{i}@example.com'
+            )
+            for i in range(5)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=follower, author=cls.author)
+            for follower in cls.followers
+        )
+        NotificationSettings.objects.bulk_create([
+            NotificationSettings(user=cls.followers[0], inbox=True),
+            NotificationSettings(user=cls.followers[1], email_digest=True),
+            NotificationSettings(user=cls.followers[2]),
+        ])
+
+    def test_post_creation_only_enqueues_fanout(self):
+        """Создание поста ставит задачу, а не пишет уведомления"""
+        Post.objects.create(author=self.author, text='Текст поста')
+        self.assertEqual(Task.objects.get().name, 'posts.fanout_post')
+        self.assertFalse(Notification.objects.exists())
+
+    def test_fanout_notifies_opted_in_followers(self):
+        """Уведомления получают только подписавшиеся на них"""
+        post = Post.objects.create(author=self.author, text='Текст поста')
+        run_tasks()
+        self.assertEqual(
+            set(Notification.objects.values_list('user__username', 'post')),
+            {('Follower0', post.id), ('Follower1', post.id)},
+        )
+        self.assertFalse(Task.objects.exists())
+
+    def test_repeated_fanout_not_duplicated(self):
+        """Повтор раздачи после сбоя не дублирует уведомления"""
+        post = Post.objects.create(author=self.author, text='Текст поста')
+        run_tasks()
+        fanout_post(post.id)
+        self.assertEqual(Notification.objects.filter(post=post).count(), 2)
+
+    def test_digest_coalesced_per_user(self):
+        """Несколько постов попадают в одну сводку раз в интервал"""
+        for i in range(3):
+            Post.objects.create(author=self.author, text=f'Текст поста {i}')
+        run_tasks()
+        self.assertEqual(send_digests(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['follower1@example.com'])
+        self.assertEqual(mail.outbox[0].body.count('/posts/'), 3)
+        Post.objects.create(author=self.author, text='Ещё пост')
+        run_tasks()
+        self.assertEqual(send_digests(), 0)
+
+    def test_inbox_page_marks_read(self):
+        """Страница уведомлений показывает и отмечает прочитанные"""
+        Post.objects.create(author=self.author, text='Текст поста')
+        run_tasks()
+        client = Client()
+        client.force_login(self.followers[0])
+        response = client.get(reverse('posts:notifications'))
+        self.assertEqual(len(response.context['page_obj']), 1)
+        self.assertFalse(
+            Notification.objects.filter(is_read=False,
+                                        user=self.followers[0]).exists()
+        )
+
+    def test_settings_form_saves_opt_in(self):
+        """Пользователь включает уведомления на странице настроек"""
+        client = Client()
+        client.force_login(self.followers[3])
+        client.post(reverse('posts:notifications'), {'inbox': 'on'})
+        self.assertTrue(NotificationSettings.objects.get(
+            user=self.followers[3]
+        ).inbox)
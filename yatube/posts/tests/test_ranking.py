@@ -0,0 +1,69 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Post, PostRank
+from posts.ranking import hot_score
+
+User = get_user_model()
+
+
+class PostRankingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.old_post = Post.objects.create(author=cls.user, text='Старый')
+        cls.new_post = Post.objects.create(author=cls.user, text='Новый')
+
+    def test_hot_score_prefers_comments_and_recency(self):
+        """Оценка растёт с комментариями и новизной поста"""
+        now = timezone.now()
+        self.assertGreater(hot_score(5, now), hot_score(0, now))
+        self.assertGreater(
+            hot_score(0, now), hot_score(0, now - timedelta(days=1))
+        )
+        self.assertGreater(
+            hot_score(100, now - timedelta(hours=1)), hot_score(0, now)
+        )
+
+    def test_comments_update_rank(self):
+        """Комментарии меняют счётчик и оценку поста"""
+        score = PostRank.objects.get(post=self.old_post).score
+        comment = Comment.objects.create(
+            post=self.old_post, author=self.user, text='Комментарий'
+        )
+        rank = PostRank.objects.get(post=self.old_post)
+        self.assertEqual(rank.comments_count, 1)
+        self.assertGreater(rank.score, score)
+        comment.delete()
+        rank.refresh_from_db()
+        self.assertEqual(rank.comments_count, 0)
+        self.assertEqual(rank.score, score)
+
+    def test_popular_page_ordered_by_score(self):
+        """Лента популярного упорядочена по оценке"""
+        PostRank.objects.filter(post=self.old_post).update(score=10 ** 6)
+        response = Client().get(reverse('posts:popular'))
+        self.assertEqual(
+            list(response.context['page_obj']),
+            [self.old_post, self.new_post],
+        )
+
+    def test_rank_posts_command_backfills(self):
+        """Команда rank_posts создаёт недостающие рейтинги"""
+        PostRank.objects.all().delete()
+        Comment.objects.bulk_create([
+            Comment(post=self.new_post, author=self.user, text='Текст'),
+            Comment(post=self.new_post, author=self.user, text='Текст'),
+        ])
+        call_command('rank_posts', batch_size=1, stdout=StringIO())
+        self.assertEqual(PostRank.objects.count(), 2)
+        self.assertEqual(
+            PostRank.objects.get(post=self.new_post).comments_count, 2
+        )
@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, GroupStats, Post
+
+User = get_user_model()
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.another_user = User.objects.create_user(username='AnotherUser')
+        cls.group = Group.objects.create(
+            title='Заголовок группы',
+            slug='test-slug',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-group',
+        )
+
+    def test_stats_follow_post_changes(self):
+        """Счётчик постов группы меняется при создании, переносе
+        и удалении поста"""
+        post = Post.objects.create(
+            author=self.user, text='Текст поста', group=self.group
+        )
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 1
+        )
+        post.group = self.other_group
+        post.save()
+        counts = dict(GroupStats.objects.values_list(
+            'group__slug', 'posts_count'
+        ))
+        self.assertEqual(counts, {'test-slug': 0, 'other-group': 1})
+        post.delete()
+        self.assertEqual(
+            GroupStats.objects.get(group=self.other_group).posts_count, 0
+        )
+
+    def test_moved_old_post_keeps_last_post_date(self):
+        """Перенос старого поста в группу не сдвигает дату последней
+        публикации назад"""
+        old_post = Post.objects.create(
+            author=self.user, text='Старый пост', group=self.other_group
+        )
+        new_post = Post.objects.create(
+            author=self.user, text='Новый пост', group=self.group
+        )
+        old_post.group = self.group
+        old_post.save()
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.posts_count, 2)
+        self.assertEqual(stats.last_post_date, new_post.pub_date)
+
+    def test_refresh_group_stats(self):
+        """Команда пересчитывает счётчики и активных авторов"""
+        Post.objects.bulk_create([
+            Post(author=self.another_user, text='Текст', group=self.group),
+            Post(author=self.another_user, text='Текст', group=self.group),
+            Post(author=self.user, text='Текст', group=self.group),
+        ])
+        call_command('refresh_group_stats', stdout=StringIO())
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.posts_count, 3)
+        self.assertIsNotNone(stats.last_post_date)
+        self.assertEqual(stats.top_authors_list, ['AnotherUser', 'SomeUser'])
+
+    def test_group_index_reads_stats(self):
+        """Каталог групп строится по таблице статистики"""
+        Post.objects.create(
+            author=self.user, text='Текст поста', group=self.group
+        )
+        with self.assertNumQueries(2):
+            response = Client().get(reverse('posts:group_index'))
+        first_stats = response.context['page_obj'][0]
+        self.assertEqual(first_stats.group, self.group)
+        self.assertEqual(first_stats.posts_count, 1)
@@ -44,6 +44,8 @@ class PostsURLTests(TestCase):
         """Общедоступные страницы доступны любому пользователю."""
         urls = [
             '/',
+            '/popular/',
+            '/groups/',
             '/group/test-slug/',
             '/profile/HasNoName/',
             '/posts/1/',
@@ -101,6 +103,7 @@ class PostsURLTests(TestCase):
         """URL-адрес использует соответствующий шаблон."""
         url_templates_names = {
             '/': 'posts/index.html',
+            '/groups/': 'posts/group_index.html',
             '/group/test-slug/': 'posts/group_list.html',
             '/profile/author/': 'posts/profile.html',
             '/posts/1/': 'posts/post_detail.html',
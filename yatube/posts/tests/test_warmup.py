@@ -0,0 +1,112 @@
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.signals import request_started
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from posts.models import Group, Post
+from posts.warmup import render_page, top_pages, warm_caches
+from users.cache import author_card_key
+
+User = get_user_model()
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+TEMP_CACHE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+small_gif = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, WARM_CACHES_CONCURRENCY=1)
+class WarmCachesTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='SomeUser')
+        cls.quiet = User.objects.create_user(username='Quiet')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Текст поста',
+            image=SimpleUploadedFile('small.gif', small_gif, 'image/gif'),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_top_pages(self):
+        """Прогреваются ленты и страницы групп, авторов и постов"""
+        urls = top_pages(10)['urls']
+        self.assertIn(reverse('posts:index'), urls)
+        self.assertIn(reverse('posts:group_list', args=['test-slug']), urls)
+        self.assertIn(reverse('posts:profile', args=['SomeUser']), urls)
+        self.assertIn(
+            reverse('posts:post_detail', args=[self.post.id]), urls
+        )
+        self.assertNotIn(reverse('posts:profile', args=['Quiet']), urls)
+
+    def test_render_page_sends_no_request_signals(self):
+        """Страница отрисовывается без тестового клиента и сигналов
+        запроса, которые закрывают соединения с базой"""
+        started = []
+
+        def receiver(**kwargs):
+            started.append(kwargs)
+
+        request_started.connect(receiver)
+        self.addCleanup(request_started.disconnect, receiver)
+        render_page(reverse('posts:group_list', args=['test-slug']))
+        self.assertEqual(started, [])
+
+    def test_caches_filled(self):
+        """После прогрева страницы и миниатюры берутся из кеша"""
+        result = warm_caches()
+        self.assertEqual(result['errors'], 0)
+        self.assertEqual(result['images'], 1)
+        self.assertIsNotNone(cache.get(author_card_key(self.user.id)))
+        renders = metrics.get_value('thumbnail_renders', format='JPEG')
+        self.client.get(reverse('posts:post_detail', args=[self.post.id]))
+        self.assertEqual(
+            metrics.get_value('thumbnail_renders', format='JPEG'), renders
+        )
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': TEMP_CACHE_DIR,
+    }})
+    def test_command(self):
+        """Команда сообщает, сколько страниц прогрета"""
+        out = StringIO()
+        call_command('warm_caches', skip_images=True, stdout=out)
+        self.assertIn('ошибок: 0', out.getvalue())
+        self.assertNotIn('Страниц: 0', out.getvalue())
+
+    def test_command_skips_pages_with_process_cache(self):
+        """С кешем процесса команда не отрисовывает страницы и
+        предупреждает об этом"""
+        out, err = StringIO(), StringIO()
+        call_command('warm_caches', stdout=out, stderr=err)
+        self.assertIn('Страниц: 0, картинок: 1', out.getvalue())
+        self.assertIn('WARM_CACHES_ON_STARTUP', err.getvalue())
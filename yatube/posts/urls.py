@@ -5,17 +5,55 @@ app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('popular/', views.popular, name='popular'),
+    path('groups/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/archive/',
+        views.profile_archive,
+        name='profile_archive'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path(
+        'posts/<int:post_id>/delete/',
+        views.post_delete,
+        name='post_delete'
+    ),
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('notifications/', views.notifications, name='notifications'),
+    path(
+        'fragments/index/',
+        views.index_fragment,
+        name='index_fragment'
+    ),
+    path(
+        'fragments/group/<slug:slug>/',
+        views.group_fragment,
+        name='group_fragment'
+    ),
+    path(
+        'fragments/profile/<str:username>/',
+        views.profile_fragment,
+        name='profile_fragment'
+    ),
+    path(
+        'fragments/follow/',
+        views.follow_fragment,
+        name='follow_fragment'
+    ),
+    path(
+        'fragments/follow/unread/',
+        views.follow_unread,
+        name='follow_unread'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
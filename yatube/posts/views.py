@@ -1,11 +1,25 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import render, get_object_or_404
-from django.views.decorators.cache import cache_page
-from .models import Post, Group, User, Follow
-from .forms import PostForm, CommentForm
+from django.urls import reverse
+from django.views.decorators.cache import never_cache
+from .models import (
+    ArchivedPost, Post, PostRank, Group, GroupStats, User, Follow,
+    Notification, NotificationSettings
+)
+from .archive import get_post
+from .deletion import delete_post
+from .feed import get_unread_count, mark_feed_seen
+from .forms import PostForm, CommentForm, NotificationSettingsForm
 from django.shortcuts import redirect
 from django.conf import settings
+from core import metrics
+from core.edge import edge_cache
+from core.pagecache import coalesced_cache_page
+from core.pagination import encode_cursor, paginate_by_cursor
+from core.ratelimit import ratelimit
+from users.cache import attach_author_cards
 
 CACHE_UPDATE_FREQUENCY = 20
 
@@ -14,41 +28,135 @@ def paginator(posts, request):
     """Формирует страницу с постами"""
     paginator = Paginator(posts, settings.POSTS_PER_PAGE)
     page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    page_obj = paginator.get_page(page_number)
+    metrics.increment('paginator_counts', source='computed')
+    return page_obj
 
 
-@cache_page(CACHE_UPDATE_FREQUENCY, key_prefix='index_page')
+def posts_page(posts, request):
+    """Страница ленты с карточками авторов из кеша"""
+    page_obj = paginator(posts, request)
+    page_obj.object_list = attach_author_cards(page_obj.object_list)
+    return page_obj
+
+
+def scroll_context(page_obj, fragment_url):
+    """Адрес и курсор для подгрузки следующих постов при прокрутке"""
+    if not page_obj.has_next():
+        return {}
+    last_post = page_obj.object_list[-1]
+    return {
+        'fragment_url': fragment_url,
+        'next_cursor': encode_cursor(last_post.pub_date, last_post.pk),
+    }
+
+
+def feed_fragment(request, post_list):
+    """Карточки постов после курсора без обвязки страницы.
+
+    Курсор следующей порции передаётся в заголовке X-Next-Cursor.
+    """
+    try:
+        posts, next_cursor = paginate_by_cursor(
+            post_list, request.GET.get('cursor'), settings.POSTS_PER_PAGE
+        )
+    except ValueError:
+        return HttpResponseBadRequest('Неверный курсор')
+    context = {
+        'posts': attach_author_cards(posts),
+    }
+    response = render(
+        request, 'posts/includes/posts_fragment.html', context
+    )
+    if next_cursor:
+        response['X-Next-Cursor'] = next_cursor
+    return response
+
+
+@edge_cache('posts')
+@coalesced_cache_page(CACHE_UPDATE_FREQUENCY, key_prefix='index_page')
 def index(request):
     """Главная страница"""
     template = 'posts/index.html'
     title = 'Последние обновления на сайте'
-    post_list = Post.objects.select_related('author').all()
-    page_obj = paginator(post_list, request)
+    post_list = Post.objects.select_related('group').all()
+    page_obj = posts_page(post_list, request)
     context = {
         'title': title,
         'page_obj': page_obj,
+        **scroll_context(page_obj, reverse('posts:index_fragment')),
     }
     return render(request, template, context)
 
 
+@edge_cache('posts')
+def index_fragment(request):
+    return feed_fragment(request, Post.objects.select_related('group'))
+
+
+@edge_cache('posts')
+def popular(request):
+    """Популярные посты"""
+    template = 'posts/index.html'
+    title = 'Популярные записи'
+    rank_list = PostRank.objects.select_related('post__group').order_by(
+        '-score'
+    )
+    page_obj = paginator(rank_list, request)
+    page_obj.object_list = attach_author_cards(
+        rank.post for rank in page_obj
+    )
+    context = {
+        'title': title,
+        'page_obj': page_obj,
+        'popular': True,
+    }
+    return render(request, template, context)
+
+
+@edge_cache('group-{slug}')
 def group_posts(request, slug):
     """Страница постов группы"""
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.select_related('author').all()
-    page_obj = paginator(post_list, request)
+    post_list = group.posts.all()
+    page_obj = posts_page(post_list, request)
     context = {
         'group': group,
         'page_obj': page_obj,
+        **scroll_context(
+            page_obj, reverse('posts:group_fragment', args=[slug])
+        ),
+    }
+    return render(request, template, context)
+
+
+@edge_cache('group-{slug}')
+def group_fragment(request, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return feed_fragment(request, group.posts.all())
+
+
+@edge_cache('groups')
+def group_index(request):
+    """Каталог групп"""
+    template = 'posts/group_index.html'
+    stats_list = GroupStats.objects.select_related('group').order_by(
+        '-posts_count', 'group__title'
+    )
+    page_obj = paginator(stats_list, request)
+    context = {
+        'page_obj': page_obj,
     }
     return render(request, template, context)
 
 
+@edge_cache('profile-{username}')
 def profile(request, username):
     """Страница польователя"""
     author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    page_obj = paginator(post_list, request)
+    post_list = author.posts.select_related('group').all()
+    page_obj = posts_page(post_list, request)
     following = False
     if request.user.is_authenticated:
         if Follow.objects.filter(user=request.user).filter(author=author):
@@ -57,24 +165,51 @@ def profile(request, username):
         'author': author,
         'page_obj': page_obj,
         'following': following,
+        'archived_count': ArchivedPost.objects.filter(author=author).count(),
+        **scroll_context(
+            page_obj, reverse('posts:profile_fragment', args=[username])
+        ),
+    }
+    return render(request, 'posts/profile.html', context)
+
 
+@edge_cache('profile-{username}')
+def profile_archive(request, username):
+    """Архивные посты пользователя"""
+    author = get_object_or_404(User, username=username)
+    post_list = author.archived_posts.select_related('group')
+    context = {
+        'author': author,
+        'page_obj': posts_page(post_list, request),
+        'archive': True,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@edge_cache('profile-{username}')
+def profile_fragment(request, username):
+    author = get_object_or_404(User, username=username)
+    return feed_fragment(request, author.posts.select_related('group'))
+
+
+@edge_cache('post-{post_id}')
 def post_detail(request, post_id):
     """Страница поста"""
-    post = get_object_or_404(Post, id=post_id)
+    post = get_post(post_id)
+    if post is None:
+        raise Http404
     form = CommentForm()
     comments = post.comments.select_related('author').all()
     context = {
         'post': post,
         'form': form,
         'comments': comments,
+        'archived': isinstance(post, ArchivedPost),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@ratelimit('posts:post_create')
 @login_required
 def post_create(request):
     """Создание нового поста"""
@@ -115,10 +250,23 @@ def post_edit(request, post_id):
     return render(request, 'posts/create_post.html', context)
 
 
+@login_required
+def post_delete(request, post_id):
+    """Удаление поста автором после подтверждения"""
+    post = get_object_or_404(Post, pk=post_id)
+    if post.author != request.user:
+        return redirect('posts:post_detail', post_id=post_id)
+    if request.method == 'POST':
+        delete_post(post)
+        return redirect('posts:profile', request.user.username)
+    return render(request, 'posts/post_delete.html', {'post': post})
+
+
+@ratelimit('posts:add_comment')
 @login_required
 def add_comment(request, post_id):
     """Создание комментария к посту"""
-    post = Post.objects.get(id=post_id)
+    post = get_object_or_404(Post, id=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -131,15 +279,41 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     """Станица подписок"""
-    post_list = Post.objects.filter(author__following__user=request.user)
-    page_obj = paginator(post_list, request)
+    post_list = Post.objects.select_related('group').filter(
+        author__following__user=request.user
+    )
+    page_obj = posts_page(post_list, request)
     context = {
         'page_obj': page_obj,
-        'title': f'Подписки пользователя {request.user}'
+        'title': f'Подписки пользователя {request.user}',
+        'follow': True,
+        'last_seen': mark_feed_seen(request.user),
+        **scroll_context(page_obj, reverse('posts:follow_fragment')),
     }
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def follow_fragment(request):
+    post_list = Post.objects.select_related('group').filter(
+        author__following__user=request.user
+    )
+    return feed_fragment(request, post_list)
+
+
+@never_cache
+@login_required
+def follow_unread(request):
+    """Счётчик новых постов для вкладки подписок.
+
+    Загружается отдельным запросом: страницы с вкладками кешируются
+    общими для всех посетителей.
+    """
+    context = {'unread_count': get_unread_count(request.user)}
+    return render(request, 'posts/includes/unread_badge.html', context)
+
+
+@ratelimit('posts:profile_follow')
 @login_required
 def profile_follow(request, username):
     """Создание подписки"""
@@ -159,3 +333,29 @@ def profile_unfollow(request, username):
     follow = get_object_or_404(Follow, author=author, user=request.user)
     follow.delete()
     return redirect('posts:profile', username=username)
+
+
+@login_required
+def notifications(request):
+    """Уведомления о новых постах и их настройки"""
+    notification_settings, _ = NotificationSettings.objects.get_or_create(
+        user=request.user
+    )
+    form = NotificationSettingsForm(
+        request.POST or None,
+        instance=notification_settings
+    )
+    if form.is_valid():
+        form.save()
+        return redirect('posts:notifications')
+    notification_list = request.user.notifications.select_related('post')
+    page_obj = paginator(notification_list, request)
+    Notification.objects.filter(
+        id__in=[notification.id for notification in page_obj],
+        is_read=False,
+    ).update(is_read=True)
+    context = {
+        'form': form,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/notifications.html', context)
@@ -0,0 +1,169 @@
+import logging
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler, WSGIRequest
+from django.db import connections
+from django.db.models import Count
+from django.urls import reverse
+
+from .images import generate_variants
+from .models import GroupStats, Post, PostRank, User
+
+logger = logging.getLogger(__name__)
+
+
+def top_pages(limit):
+    """Страницы для прогрева: общие ленты и по ``limit`` самых больших
+    групп, самых активных авторов и самых популярных постов."""
+    slugs = list(
+        GroupStats.objects.filter(posts_count__gt=0)
+        .order_by('-posts_count')
+        .values_list('group__slug', flat=True)[:limit]
+    )
+    usernames = list(
+        User.objects.annotate(posts_count=Count('posts'))
+        .filter(posts_count__gt=0)
+        .order_by('-posts_count')
+        .values_list('username', flat=True)[:limit]
+    )
+    post_ids = list(
+        PostRank.objects.order_by('-score')
+        .values_list('post_id', flat=True)[:limit]
+    )
+    return {
+        'slugs': slugs,
+        'usernames': usernames,
+        'post_ids': post_ids,
+        'urls': [
+            reverse('posts:index'),
+            reverse('posts:popular'),
+            reverse('posts:group_index'),
+            *(reverse('posts:group_list', args=[slug]) for slug in slugs),
+            *(reverse('posts:profile', args=[name]) for name in usernames),
+            *(reverse('posts:post_detail', args=[pk]) for pk in post_ids),
+        ],
+    }
+
+
+def page_images(pages):
+    """Картинки постов, видимых на первых страницах прогреваемых лент."""
+    feeds = [
+        Post.objects.all(),
+        Post.objects.filter(id__in=pages['post_ids']),
+        *(Post.objects.filter(group__slug=slug) for slug in pages['slugs']),
+        *(Post.objects.filter(author__username=name)
+          for name in pages['usernames']),
+    ]
+    images = set()
+    for feed in feeds:
+        images.update(
+            feed.exclude(image='').order_by('-pub_date')
+            .values_list('image', flat=True)[:settings.POSTS_PER_PAGE]
+        )
+    return sorted(images)
+
+
+@lru_cache(maxsize=None)
+def get_handler():
+    """Обработчик Django с цепочкой middleware, общий для потоков."""
+    return WSGIHandler()
+
+
+def build_request(url):
+    """Запрос анонимного посетителя к адресу из SITE_URL."""
+    site = urlsplit(settings.SITE_URL)
+    path, _, query = url.partition('?')
+    return WSGIRequest({
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'SERVER_NAME': site.hostname,
+        'SERVER_PORT': str(
+            site.port or (443 if site.scheme == 'https' else 80)
+        ),
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': site.netloc,
+        'HTTP_ACCEPT_ENCODING': 'gzip, deflate, br',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': site.scheme,
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    })
+
+
+def render_page(url):
+    """Пропускает запрос через обработчик Django, как запрос браузера
+    анонимного посетителя: ответ попадает во все кеши приложения.
+
+    Обработчик вызывается напрямую, без тестового клиента и сигналов
+    начала и конца запроса, поэтому прогрев можно запускать рядом с
+    обработкой настоящих запросов.
+    """
+    response = get_handler().get_response(build_request(url))
+    if response.status_code != 200:
+        raise ValueError(f'{url}: ответ {response.status_code}')
+
+
+def run_all(function, items, concurrency):
+    """Выполняет ``function`` для всех элементов не более чем в
+    ``concurrency`` потоков. Возвращает число ошибок."""
+    def run(item):
+        try:
+            function(item)
+        except Exception:
+            logger.exception('Прогрев %s не удался', item)
+            return False
+        finally:
+            if concurrency > 1:
+                connections.close_all()
+        return True
+
+    if concurrency <= 1:
+        results = [run(item) for item in items]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(run, items))
+    return results.count(False)
+
+
+def warm_caches(limit=None, concurrency=None, images=True, render=True):
+    """Заполняет кеши после запуска: сначала создаёт миниатюры для
+    прогреваемых страниц, затем отрисовывает сами страницы.
+
+    Без ``render`` страницы не отрисовываются: их кеш заполнил бы
+    только текущий процесс. Возвращает словарь с числом страниц,
+    картинок и ошибок.
+    """
+    limit = limit or settings.WARM_CACHES_LIMIT
+    concurrency = concurrency or settings.WARM_CACHES_CONCURRENCY
+    pages = top_pages(limit)
+    image_names = page_images(pages) if images else []
+    urls = pages['urls'] if render else []
+    errors = run_all(generate_variants, image_names, concurrency)
+    errors += run_all(render_page, urls, concurrency)
+    return {
+        'pages': len(urls),
+        'images': len(image_names),
+        'errors': errors,
+    }
+
+
+def warm_in_background():
+    """Прогрев в фоновом потоке, чтобы не задерживать запуск процесса."""
+    def warm():
+        try:
+            logger.info('Прогрев кешей: %s', warm_caches())
+        finally:
+            connections.close_all()
+
+    threading.Thread(target=warm, name='warm-caches', daemon=True).start()
@@ -0,0 +1,118 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY, HASH_SESSION_KEY, get_user_model
+)
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+
+from core import caching, metrics
+
+User = get_user_model()
+
+USER_CACHE_TIMEOUT = 300
+AUTHOR_CARD_TIMEOUT = 60 * 60
+
+
+def user_cache_key(user_id, session_hash):
+    return f'auth_user:{user_id}:{session_hash}'
+
+
+def author_card_key(user_id):
+    return f'author_card:{user_id}'
+
+
+def session_auth_hash(user, password):
+    """Хеш сессии, который был бы у пользователя с паролем ``password``."""
+    current_password = user.password
+    user.password = password
+    try:
+        return user.get_session_auth_hash()
+    finally:
+        user.password = current_password
+
+
+def get_user(request):
+    """Пользователь сессии из кеша, при промахе — из базы.
+
+    Ключ включает хеш пароля из сессии: после смены пароля старые сессии
+    не находят пользователя в кеше и проверяются обычным способом.
+    Сброс кеша при смене пароля или блокировке должны увидеть все
+    процессы, поэтому с кешем процесса пользователь читается из базы.
+    """
+    if not caching.is_shared():
+        return auth.get_user(request)
+    session = request.session
+    session_hash = session.get(HASH_SESSION_KEY)
+    backend_path = session.get(BACKEND_SESSION_KEY)
+    backends = settings.AUTHENTICATION_BACKENDS
+    if not session_hash or backend_path not in backends:
+        return auth.get_user(request)
+    try:
+        user_id = User._meta.pk.to_python(session[auth.SESSION_KEY])
+    except KeyError:
+        return AnonymousUser()
+    key = user_cache_key(user_id, session_hash)
+    user = cache.get(key)
+    metrics.cache_lookup(
+        'auth_user', hits=user is not None, misses=user is None
+    )
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user
+    user.backend = backend_path
+    return user
+
+
+def invalidate_user(user, passwords=()):
+    """Удаляет закешированного пользователя и его карточку автора."""
+    keys = [author_card_key(user.pk)]
+    for password in set(passwords):
+        if password:
+            keys.append(
+                user_cache_key(user.pk, session_auth_hash(user, password))
+            )
+    cache.delete_many(keys)
+
+
+def get_author_cards(user_ids):
+    """Имена авторов для карточек постов: один запрос к кешу и не больше
+    одного запроса к базе для отсутствующих в кеше."""
+    user_ids = set(user_ids)
+    keys = {author_card_key(user_id): user_id for user_id in user_ids}
+    cards = {
+        keys[key]: card for key, card in cache.get_many(list(keys)).items()
+    }
+    missing = user_ids - set(cards)
+    metrics.cache_lookup(
+        'author_card', hits=len(cards), misses=len(missing)
+    )
+    if missing:
+        loaded = {}
+        for row in User.objects.filter(id__in=missing).values(
+            'id', 'username', 'first_name', 'last_name'
+        ):
+            full_name = f'{row["first_name"]} {row["last_name"]}'.strip()
+            loaded[row['id']] = {
+                'username': row['username'],
+                'full_name': full_name,
+            }
+        cache.set_many(
+            {author_card_key(user_id): card
+             for user_id, card in loaded.items()},
+            AUTHOR_CARD_TIMEOUT,
+        )
+        cards.update(loaded)
+    return cards
+
+
+def attach_author_cards(posts):
+    """Подставляет постам карточки авторов, чтобы шаблон не обращался
+    к auth_user. Возвращает список постов."""
+    posts = list(posts)
+    cards = get_author_cards(post.author_id for post in posts)
+    for post in posts:
+        post.author_card = cards.get(post.author_id)
+    return posts
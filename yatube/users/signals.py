@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_user
+
+User = get_user_model()
+
+
+@receiver(post_init, sender=User)
+def remember_loaded_password(sender, instance, **kwargs):
+    # __dict__ вместо атрибута: отложенное поле не должно вызывать запрос.
+    instance._loaded_password = instance.__dict__.get('password')
+
+
+@receiver(post_save, sender=User)
+def invalidate_saved_user(sender, instance, **kwargs):
+    invalidate_user(
+        instance, (instance._loaded_password, instance.password)
+    )
+    instance._loaded_password = instance.password
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user(sender, instance, **kwargs):
+    invalidate_user(instance, (instance._loaded_password,))
@@ -0,0 +1,102 @@
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Post
+from users.cache import get_author_cards
+
+User = get_user_model()
+TEMP_CACHE_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': TEMP_CACHE_DIR,
+    }
+})
+class CachedUserTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='SomeUser', first_name='Имя', password='old-password'
+        )
+        Post.objects.create(author=cls.user, text='Текст поста')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_CACHE_DIR, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def tearDown(self):
+        cache.clear()
+
+    def get_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.authorized_client.get(url)
+        return [query['sql'] for query in queries]
+
+    def test_user_loaded_from_cache(self):
+        """Повторный запрос не читает auth_user"""
+        url = reverse('posts:follow_index')
+        self.authorized_client.get(url)
+        queries = self.get_queries(url)
+        self.assertFalse(any('auth_user' in sql for sql in queries))
+
+    def test_password_change_logs_out_other_sessions(self):
+        """После смены пароля другие сессии не берут пользователя из кеша"""
+        url = reverse('posts:follow_index')
+        self.authorized_client.get(url)
+        self.user.set_password('new-password')
+        self.user.save()
+        response = self.authorized_client.get(url)
+        self.assertRedirects(response, f'/auth/login/?next={url}')
+
+    def test_feed_uses_cached_author_cards(self):
+        """Лента берёт имена авторов из кеша без join с auth_user"""
+        url = reverse('posts:popular')
+        self.authorized_client.get(url)
+        queries = self.get_queries(url)
+        self.assertFalse(any('auth_user' in sql for sql in queries))
+        response = self.authorized_client.get(url)
+        self.assertContains(response, 'Автор: Имя')
+
+    def test_author_card_invalidated_on_save(self):
+        """Карточка автора обновляется после изменения имени"""
+        self.assertEqual(
+            get_author_cards([self.user.id])[self.user.id]['full_name'], 'Имя'
+        )
+        self.user.first_name = 'Новое'
+        self.user.save()
+        self.assertEqual(
+            get_author_cards([self.user.id])[self.user.id]['full_name'],
+            'Новое',
+        )
+
+
+class ProcessCacheUserTests(TestCase):
+    def test_user_read_from_db_without_shared_cache(self):
+        """С кешем процесса пользователь сессии читается из базы"""
+        user = User.objects.create_user(username='SomeUser')
+        client = Client()
+        client.force_login(user)
+        url = reverse('posts:follow_index')
+        client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        self.assertTrue(
+            any('auth_user' in query['sql'] for query in queries)
+        )
+        cache.clear()
@@ -46,25 +46,46 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail'
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.profiling.SQLProfilingMiddleware',
+    'core.profiling.SamplingProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
+# Сессия читается из кеша и пишется в кеш и базу одновременно, поэтому
+# авторизованные запросы обычно не обращаются к django_session. С кешем,
+# который у каждого процесса свой (LocMemCache), core.sessions работает
+# как 'django.contrib.sessions.backends.db': выход в одном процессе
+# иначе не завершил бы сессию в остальных.
+# Без сохранения на сервере: 'django.contrib.sessions.backends.signed_cookies'.
+SESSION_ENGINE = 'core.sessions'
+SESSION_CACHE_ALIAS = 'default'
+
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Медиафайлы отдаёт core.views.media. Передачу файла можно поручить
+# фронтенд-серверу: 'x-accel-redirect' (nginx, внутренний location
+# MEDIA_ACCEL_PREFIX с alias на MEDIA_ROOT) или 'x-sendfile' (Apache,
+# lighttpd). None — файл отдаёт Django, для локальной разработки.
+MEDIA_SENDFILE = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_PUBLIC_DIRS = ('posts/', 'cache/')
+MEDIA_MAX_AGE = 7 * 24 * 60 * 60
 
 TEMPLATES = [
     {
@@ -137,19 +158,155 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# Хешированные имена требуют собранной статики, поэтому включаются только
+# вне режима отладки. Файлы отдаёт core.wsgi.StaticFilesApplication.
+if not DEBUG:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+STATIC_MAX_AGE = 60
+STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма ставятся в очередь и отправляются командой send_queued_mail
+# через EMAIL_QUEUE_BACKEND. Файловый бэкенд — локальная замена SMTP.
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+EMAIL_QUEUE_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_QUEUE_MAX_ATTEMPTS = 5
+EMAIL_QUEUE_RETRY_DELAY = 60
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POSTS_PER_PAGE = 10
+# Посты старше этого возраста команда archive_posts переносит в архив.
+POSTS_ARCHIVE_AFTER_DAYS = 365
+# Варианты картинок постов для srcset: ширины, пропорции и подсказка
+# sizes с шириной картинки в вёрстке. Варианты создаются фоновой задачей
+# после загрузки картинки (и командой generate_image_variants).
+# Форматы перечислены по предпочтению, последний — для старых браузеров.
+IMAGE_VARIANTS = {
+    'card': {
+        'widths': (480, 720, 960, 1440),
+        'ratio': (960, 339),
+        'sizes': '(max-width: 575px) 100vw, (max-width: 767px) 516px, '
+                 '(max-width: 991px) 696px, (max-width: 1199px) 936px, '
+                 '1116px',
+    },
+    'detail': {
+        'widths': (480, 720, 960),
+        'ratio': (960, 339),
+        'sizes': '(max-width: 767px) 100vw, (max-width: 991px) 522px, '
+                 '(max-width: 1199px) 702px, 837px',
+    },
+}
+IMAGE_VARIANT_FORMATS = ('WEBP', 'JPEG')
+THUMBNAIL_BACKEND = 'posts.images.CountingThumbnailBackend'
+
+# Кеш страниц (core.pagecache.coalesced_cache_page): после истечения
+# страница ещё PAGE_CACHE_STALE секунд отдаётся устаревшей, пока один
+# процесс её пересчитывает. Без копии в кеше остальные запросы ждут
+# её не дольше PAGE_CACHE_WAIT секунд.
+PAGE_CACHE_STALE = 60
+PAGE_CACHE_LOCK_TIMEOUT = 10
+PAGE_CACHE_WAIT = 2
+
+# Прогрев кешей после запуска (команда warm_caches): ленты, страницы
+# WARM_CACHES_LIMIT самых больших групп, активных авторов и популярных
+# постов в WARM_CACHES_CONCURRENCY потоков. WARM_CACHES_ON_STARTUP
+# запускает прогрев в фоне при старте каждого процесса WSGI. С кешем
+# LocMemCache, который у каждого процесса свой, страницы прогревает
+# только он: команда создаёт лишь варианты картинок.
+WARM_CACHES_LIMIT = 10
+WARM_CACHES_CONCURRENCY = 4
+WARM_CACHES_ON_STARTUP = False
+
+# Комментарии удаляемого поста удаляются пачками такого размера.
+POST_DELETE_BATCH_SIZE = 500
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
+# LocMemCache у каждого процесса свой. Для нескольких процессов сервера
+# и фоновых задач нужен общий бэкенд (Memcached, Redis или
+# FileBasedCache): без него счётчики новых постов пересчитываются по
+# базе раз в минуту, пользователь сессии не кешируется, а лимиты
+# запросов и кеш страниц действуют в каждом процессе отдельно
+# (core.caching.is_shared).
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+
+# Уровни сжатия ответов по типу содержимого: gzip 1-9, brotli 0-11.
+# Ответы с типами, которых нет в словаре, не сжимаются.
+COMPRESSION_LEVELS = {
+    'text/html': {'br': 5, 'gzip': 6},
+    'text/plain': {'br': 5, 'gzip': 6},
+    'application/json': {'br': 4, 'gzip': 5},
+    'text/css': {'br': 9, 'gzip': 9},
+    'application/javascript': {'br': 9, 'gzip': 9},
+}
+COMPRESSION_MINIFY_HTML = True
+
+# Лимиты запросов на запись: корзины жетонов по адресу и по пользователю.
+# Формат '10/m' — десять запросов в минуту (s, m, h, d). Корзины хранятся
+# в кеше RATELIMIT_CACHE. Если это LocMemCache, у каждого процесса
+# сервера свои корзины, и при N процессах клиент может сделать до N раз
+# больше запросов: для нескольких процессов укажите общий бэкенд.
+RATELIMIT_CACHE = 'default'
+RATELIMITS = {
+    'posts:post_create': {'ip': '30/m', 'user': '10/m'},
+    'posts:add_comment': {'ip': '60/m', 'user': '20/m'},
+    'posts:profile_follow': {'ip': '60/m', 'user': '30/m'},
+    'users:signup': {'ip': '10/h'},
+}
+
+SITE_URL = 'http://127.0.0.1:8000'
+
+# Профилирование SQL: запросы view из SQL_PROFILING_VIEWS дольше порога
+# пишутся с планом выполнения в журнал с ротацией. Сводка — команда
+# sql_profile_report.
+SQL_PROFILING = False
+SQL_PROFILING_THRESHOLD_MS = 100
+SQL_PROFILING_VIEWS = ('posts.views',)
+SQL_PROFILING_LOG = os.path.join(BASE_DIR, 'logs', 'slow_sql.log')
+SQL_PROFILING_LOG_MAX_BYTES = 5 * 1024 * 1024
+SQL_PROFILING_LOG_BACKUPS = 5
+
+# Профилировщик по выборкам стеков включается из админки
+# (/admin/profiler/) на заданное время во всех процессах, которые видят
+# общий кеш. Стеки запросов к SAMPLING_PROFILER_VIEWS снимаются раз в
+# SAMPLING_PROFILER_INTERVAL секунд и пишутся в SAMPLING_PROFILER_DIR
+# в формате свёрнутых стеков для flamegraph.
+SAMPLING_PROFILER_VIEWS = ('posts.views',)
+SAMPLING_PROFILER_INTERVAL = 0.005
+SAMPLING_PROFILER_MAX_SECONDS = 300
+SAMPLING_PROFILER_DIR = os.path.join(BASE_DIR, 'logs', 'profiles')
+
+# Счётчики приложения отдаются по /metrics в формате Prometheus. Когда
+# запущено несколько процессов, каждый раз в METRICS_FLUSH_INTERVAL
+# секунд пишет изменившиеся счётчики в свой файл в
+# METRICS_MULTIPROCESS_DIR, а /metrics складывает файлы всех процессов.
+# Файлы завершившихся процессов тоже учитываются, сам каталог не
+# очищается; None — счётчики только текущего процесса.
+METRICS_PREFIX = 'yatube_'
+METRICS_MULTIPROCESS_DIR = None
+METRICS_FLUSH_INTERVAL = 1
+METRICS_ALLOWED_IPS = ('127.0.0.1',)
+
+# Публичные страницы для анонимов кешируются прокси перед приложением
+# (core.edge.edge_cache). При изменении постов по EDGE_PURGE_URL
+# отправляется PURGE с ключами страниц; пустое значение отключает
+# очистку. Локальный прокси запускается командой edge_proxy.
+EDGE_CACHE_MAX_AGE = 20
+EDGE_CACHE_STALE = 60
+EDGE_PURGE_URL = ''
+
+TASK_MAX_ATTEMPTS = 5
+TASK_RETRY_DELAY = 30
+
+NOTIFICATION_FANOUT_CHUNK = 1000
+NOTIFICATION_DIGEST_INTERVAL = 24 * 60 * 60
@@ -14,24 +14,30 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.conf import settings
-from django.conf.urls.static import static
-from xml.etree.ElementInclude import include
 from django.contrib import admin
 from django.urls import include, path
 
+from core.views import media, metrics, sampling_profile, sampling_profiler
+
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
+    path(
+        'admin/profiler/', sampling_profiler, name='sampling_profiler'
+    ),
+    path(
+        'admin/profiler/<str:session>.folded',
+        sampling_profile,
+        name='sampling_profile',
+    ),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('api/v1/', include('api.urls', namespace='api')),
+    path('metrics', metrics, name='metrics'),
+    path(f'{settings.MEDIA_URL.lstrip("/")}<path:path>', media, name='media'),
 ]
 
 handler404 = 'core.views.page_not_found'
 handler500 = 'core.views.server_error'
 handler403 = 'core.views.permission_denied'
-
-if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
@@ -13,4 +13,13 @@ from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
-application = get_wsgi_application()
+from django.conf import settings  # noqa: E402
+
+from core.wsgi import StaticFilesApplication  # noqa: E402
+
+application = StaticFilesApplication(get_wsgi_application())
+
+if settings.WARM_CACHES_ON_STARTUP:
+    from posts.warmup import warm_in_background
+
+    warm_in_background()